@@ -3,12 +3,14 @@
 import unittest, sys
 
 import test_schedule
+import test_layout
 
 
 def test_all():
 	suite = unittest.TestSuite()
 
 	suite.addTest(test_schedule.suite())
+	suite.addTest(test_layout.suite())
 
 	result = unittest.TextTestRunner(verbosity = 2).run(suite)
 
@@ -0,0 +1,674 @@
+#!/usr/bin/python
+
+# These tests only exercise modules that do not depend on wx, so they
+# can run without a display.
+
+import sys, os, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'wxScheduler'))
+
+from wxScheduleIndex import wxScheduleIndex
+from wxSchedulePacker import packChains, packColumns, packRows
+from wxSchedulerLayout import wxLayoutState, wxLayoutMetrics, wxLayoutCache, computeLayout, computeHeaderLayout, \
+     relayoutPeriods
+from wxSlotGrid import wxSlotGrid
+from wxSpatialIndex import wxSpatialIndex
+from wxTextMetrics import wxTextMetrics, layoutParagraph
+from wxTileCache import wxTileCache
+from wxTimeAxis import wxTimeAxis
+
+
+class TestScheduleIndex(unittest.TestCase):
+	def setUp(self):
+		self.index = wxScheduleIndex()
+		self.items = {}
+		for name, start, end in [('a', 0, 10), ('b', 5, 15), ('c', 20, 30),
+					 ('d', 25, 26), ('e', 40, 100), ('f', 10, 10)]:
+			self.items[name] = object()
+			self.index.Add(self.items[name], start, end)
+
+	def query(self, start, end):
+		names = dict([(id(item), name) for name, item in self.items.items()])
+		return [names[id(item)] for item in self.index.Query(start, end)]
+
+	def test_overlap(self):
+		"""Items overlapping the query"""
+
+		self.assertEqual(self.query(8, 22), ['a', 'b', 'f', 'c'])
+
+	def test_bounds(self):
+		"""Bounds are inclusive"""
+
+		self.assertEqual(self.query(15, 20), ['b', 'c'])
+		self.assertEqual(self.query(31, 39), [])
+
+	def test_long_item(self):
+		"""An item spanning the whole query is found"""
+
+		self.assertEqual(self.query(60, 70), ['e'])
+
+	def test_remove(self):
+		"""Removed items are not returned"""
+
+		self.index.Remove(self.items['b'])
+		self.assertEqual(self.query(8, 22), ['a', 'f', 'c'])
+		self.assertEqual(len(self.index), 5)
+
+	def test_update(self):
+		"""Moving an item"""
+
+		self.assertTrue(self.index.Update(self.items['e'], 0, 1))
+		self.assertFalse(self.index.Update(self.items['e'], 0, 1))
+		self.assertEqual(self.query(60, 70), [])
+		self.assertEqual(self.query(0, 0), ['a', 'e'])
+
+	def test_brute_force(self):
+		"""Compare with a linear scan"""
+
+		import random
+		rnd = random.Random(42)
+		index = wxScheduleIndex()
+		intervals = []
+		for idx in range(500):
+			start = rnd.randint(0, 10000)
+			interval = (start, start + rnd.randint(0, 500), idx)
+			intervals.append(interval)
+			index.Add(interval, interval[0], interval[1])
+
+		for idx in range(100):
+			start = rnd.randint(0, 10000)
+			end = start + rnd.randint(0, 300)
+			expected = [interval for interval in intervals if interval[0] <= end and interval[1] >= start]
+			expected.sort(key=lambda interval: (interval[0], interval[2]))
+			self.assertEqual(index.Query(start, end), expected)
+
+	def test_incremental(self):
+		"""Changes after a query keep the index consistent"""
+
+		import random
+		rnd = random.Random(7)
+		index = wxScheduleIndex()
+		index.chunkSize = 4
+		items = [object() for idx in range(200)]
+		intervals = {}
+
+		def interval():
+			start = rnd.randint(0, 2000)
+			return start, start + rnd.randint(0, 200)
+
+		index.Load([(item, ) + intervals.setdefault(id(item), interval()) for item in items[:100]])
+		for idx in range(300):
+			index.Query(0, 0)
+			item = rnd.choice(items)
+			if id(item) in intervals and rnd.random() < 0.4:
+				index.Remove(item)
+				del intervals[id(item)]
+			else:
+				intervals[id(item)] = interval()
+				index.Update(item, *intervals[id(item)])
+
+			start = rnd.randint(0, 2200)
+			end = start + rnd.randint(0, 100)
+			expected = set(key for key, (first, last) in intervals.items() if first <= end and last >= start)
+			found = index.QueryIntervals(start, end)
+			self.assertEqual(set(id(item) for item, _, _ in found), expected)
+			self.assertEqual([first for _, first, _ in found], sorted(first for _, first, _ in found))
+
+		self.assertEqual(len(index), len(intervals))
+		self.assertTrue(max(len(chunk) for chunk in index._chunks) <= 8)
+
+
+class TestPackColumns(unittest.TestCase):
+	def test_no_overlap(self):
+		"""Schedules that do not overlap use the full width"""
+
+		self.assertEqual(packColumns([(0, 10), (10, 20), (30, 40)]),
+				 [(0, 1), (0, 1), (0, 1)])
+
+	def test_clusters(self):
+		"""Each cluster has its own column count"""
+
+		self.assertEqual(packColumns([(0, 10), (5, 15), (8, 12), (20, 30), (25, 35)]),
+				 [(0, 3), (1, 3), (2, 3), (0, 2), (1, 2)])
+
+	def test_column_reuse(self):
+		"""A column is reused once free, inside a cluster"""
+
+		self.assertEqual(packColumns([(0, 10), (5, 30), (12, 20)]),
+				 [(0, 2), (1, 2), (0, 2)])
+
+	def test_input_order(self):
+		"""Results follow the input order"""
+
+		self.assertEqual(packColumns([(5, 15), (0, 10)]), [(1, 2), (0, 2)])
+
+	def test_many(self):
+		"""No two overlapping intervals share a column"""
+
+		import random
+		rnd = random.Random(1)
+		intervals = []
+		for idx in range(300):
+			start = rnd.randint(0, 1000)
+			intervals.append((start, start + rnd.randint(1, 60)))
+		columns = packColumns(intervals)
+		for i, (s1, e1) in enumerate(intervals):
+			self.assertTrue(columns[i][0] < columns[i][1])
+			for j, (s2, e2) in enumerate(intervals):
+				if i != j and s1 < e2 and s2 < e1:
+					self.assertNotEqual(columns[i][0], columns[j][0])
+					self.assertEqual(columns[i][1], columns[j][1])
+
+
+class TestPackRows(unittest.TestCase):
+	def test_reuse(self):
+		"""Rows are reused as soon as they are free"""
+
+		self.assertEqual(packRows([(0, 10), (5, 15), (10, 20), (15, 25)]),
+				 [[0, 2], [1, 3]])
+
+	def test_minimal(self):
+		"""Row count is the maximum overlap"""
+
+		import random
+		rnd = random.Random(2)
+		intervals = []
+		for idx in range(300):
+			start = rnd.randint(0, 1000)
+			intervals.append((start, start + rnd.randint(1, 100)))
+		rows = packRows(intervals)
+
+		depth = max([len([1 for s, e in intervals if s <= t < e]) for t in range(1100)])
+		self.assertEqual(len(rows), depth)
+		self.assertEqual(sorted(sum(rows, [])), list(range(len(intervals))))
+
+		for row in rows:
+			for prev, cur in zip(row, row[1:]):
+				self.assertTrue(intervals[prev][1] <= intervals[cur][0])
+
+
+class TestPackChains(unittest.TestCase):
+	def test_chains(self):
+		"""Each row chains the nearest following interval"""
+
+		self.assertEqual(packChains([(0, 10), (5, 15), (10, 20), (15, 25)]),
+				 [[0, 2], [1, 3]])
+		self.assertEqual(packChains([(0, 10), (30, 40), (12, 20)]),
+				 [[0, 2, 1]])
+
+
+class TestTimeAxis(unittest.TestCase):
+	# Same cases as TestScheduleAdjuster1 and TestScheduleAdjuster2,
+	# in minutes: (start, end, (size, position))
+	ADJUSTER1_CASES = [((8, 30), (11, 0), (2.5, 0.5)),
+			   ((14, 0), (17, 30), (3.5, 4.5)),
+			   ((10, 0), (12, 30), (2.0, 2.0)),
+			   ((12, 30), (14, 30), (1.0, 4.0)),
+			   ((10, 0), (16, 0), (4.5, 2.0))]
+	ADJUSTER2_CASES = [((9, 0), (11, 0), (2.0, 1.0)),
+			   ((14, 0), (17, 30), (3.5, 5.0)),
+			   ((10, 0), (13, 30), (3.0, 2.0)),
+			   ((13, 30), (14, 30), (0.5, 5.0)),
+			   ((10, 0), (16, 0), (5.0, 2.0)),
+			   ((6, 0), (7, 0), (0.0, 0.0)),
+			   ((20, 0), (21, 0), (0.0, 9.0))]
+
+	def setUp(self):
+		self.day = 734000
+		self.axis = wxTimeAxis(self.day, 3, [(8 * 60, 12 * 60), (13 * 60 + 30, 18 * 60)])
+		self.axis2 = wxTimeAxis(self.day, 3, [(8 * 60, 13 * 60), (14 * 60, 18 * 60)])
+
+	def at(self, hour, minute=0, day=0):
+		return (self.day + day) * 1440 + hour * 60 + minute
+
+	def checkSizes(self, axis, cases, total, vectorize):
+		starts = [self.at(*start) for start, _, _ in cases]
+		ends = [self.at(*end) for _, end, _ in cases]
+
+		self.assertEqual(axis.ScheduleSizes(starts, ends, vectorize=vectorize),
+				 [sizes + (total,) for _, _, sizes in cases])
+
+	def test_schedule_sizes(self):
+		"""Schedules around the pause"""
+
+		for start, end, expected in self.ADJUSTER1_CASES:
+			self.assertEqual(self.axis.ScheduleSize(self.at(*start), self.at(*end)),
+					 expected + (25.5,))
+
+		self.checkSizes(self.axis, self.ADJUSTER1_CASES, 25.5, False)
+
+	def test_several_days(self):
+		"""Schedule spanning days"""
+
+		self.assertEqual(self.axis.ScheduleSize(self.at(15, 0, 1), self.at(15, 0, 2)),
+				 (8.5, 14.0, 25.5))
+
+	def test_contains(self):
+		"""Pauses are inside the axis, nights are not"""
+
+		self.assertTrue(self.axis.Contains(self.at(12, 45)))
+		self.assertTrue(self.axis.Contains(self.at(8, 0, 2)))
+		self.assertFalse(self.axis.Contains(self.at(19, 0)))
+		self.assertFalse(self.axis.Contains(self.at(7, 0)))
+
+	def test_scalar(self):
+		"""Scalar path (TestScheduleAdjuster2 cases)"""
+
+		self.checkSizes(self.axis2, self.ADJUSTER2_CASES, 27.0, False)
+
+	def test_vectorized(self):
+		"""NumPy path (TestScheduleAdjuster1 and 2 cases)"""
+
+		try:
+			import numpy
+		except ImportError:
+			self.skipTest("NumPy not installed")
+
+		self.checkSizes(self.axis, self.ADJUSTER1_CASES, 25.5, True)
+		self.checkSizes(self.axis2, self.ADJUSTER2_CASES, 27.0, True)
+
+	def test_week_days(self):
+		"""Working hours depending on the week day"""
+
+		import datetime
+		sunday = datetime.date(2010, 1, 31).toordinal()
+		axis = wxTimeAxis(sunday, 2, {1: [(9 * 60, 17 * 60)]})
+		self.assertEqual(axis.GetTotal(), 8 * 60)
+		self.assertEqual(axis.Position((sunday + 1) * 1440 + 10 * 60), 60)
+
+
+class TestSlotGrid(unittest.TestCase):
+	def test_vertical(self):
+		"""Columns are days and rows slots"""
+
+		grid = wxSlotGrid(50, 20, 100.0, 10.0, 3, 4, 1000, [480, 510, 540, 570])
+
+		self.assertEqual(len(grid), 12)
+		self.assertEqual(grid.GetSlot(50, 20), (1000, 480))
+		self.assertEqual(grid.GetSlot(255, 45), (1002, 540))
+		# Right and bottom edges are included
+		self.assertEqual(grid.GetSlot(350, 60), (1002, 570))
+		self.assertEqual(grid.GetSlot(49, 20), None)
+		self.assertEqual(grid.GetSlot(50, 61), None)
+
+		self.assertEqual(grid.GetSlotRect(1001, 525), (150.0, 30.0, 250.0, 40.0))
+		self.assertEqual(grid.GetSlotRect(1001, 470), None)
+		self.assertEqual(grid.GetSlotRect(1003, 480), None)
+		self.assertEqual(grid.HitTest(160, 35), (1001, 510, (150.0, 30.0, 250.0, 40.0)))
+
+	def test_horizontal(self):
+		"""Each day takes consecutive cells"""
+
+		grid = wxSlotGrid(0, 0, 10.0, 30, 6, 1, 1000, [480, 510, 540], vertical=False)
+
+		self.assertEqual(grid.GetSlot(25, 10), (1000, 540))
+		self.assertEqual(grid.GetSlot(35, 10), (1001, 480))
+		self.assertEqual(grid.GetSlotRect(1001, 545), (50.0, 0, 60.0, 30))
+
+	def test_month(self):
+		"""Cells out of the day range have no slot"""
+
+		grid = wxSlotGrid(0, 0, 10, 10, 7, 5, 998, [0], vertical=False, dayRange=(1000, 1030))
+
+		self.assertEqual(len(grid), 31)
+		self.assertEqual(grid.GetSlot(15, 5), None)
+		self.assertEqual(grid.GetSlot(25, 5), (1000, 0))
+		self.assertEqual(grid.GetSlot(5, 15), (1005, 0))
+		self.assertEqual(grid.GetSlotRect(1030, 0), (40, 40, 50, 50))
+		self.assertEqual(grid.GetSlot(45, 45), (1030, 0))
+
+
+class TestSpatialIndex(unittest.TestCase):
+	def setUp(self):
+		self.index = wxSpatialIndex([('a', 0, 0, 100, 50), ('b', 50, 40, 60, 300),
+					     ('c', 200, 200, 210, 210), ('d', 0, 0, 1000, 1000)], cellSize=32)
+
+	def test_point(self):
+		"""Items under a point, in the order they were added"""
+
+		self.assertEqual(self.index.ItemsAt(55, 45), ['a', 'b', 'd'])
+		self.assertEqual(self.index.ItemsAt(100, 50), ['a', 'd'])
+		self.assertEqual(self.index.ItemsAt(1001, 0), [])
+
+	def test_margin(self):
+		"""Rectangles can be grown to find edges"""
+
+		self.assertEqual(self.index.ItemsAt(205, 196), ['d'])
+		self.assertEqual(self.index.ItemsAt(205, 196, 4), ['c', 'd'])
+
+	def test_rect(self):
+		"""Rubber band queries"""
+
+		self.assertEqual(self.index.ItemsInRect(58, 100, 205, 205), ['b', 'c', 'd'])
+		self.assertEqual(self.index.ItemsInRect(-10, -10, -1, -1), [])
+
+
+class TestLayout(unittest.TestCase):
+	# Monday, 2010-02-01
+	day = 733804
+
+	def setUp(self):
+		self.index = wxScheduleIndex()
+		self.metrics = wxLayoutMetrics()
+
+	def add(self, day, startMinute, endMinute):
+		schedule = object()
+		self.index.Add(schedule, (self.day + day) * 86400 + startMinute * 60,
+			       (self.day + day) * 86400 + endMinute * 60)
+		return schedule
+
+	def layout(self, **kwargs):
+		parameters = dict(day=self.day, today=0, width=450, height=424)
+		parameters.update(kwargs)
+		return computeLayout(wxLayoutState(**parameters), self.index.QueryIntervals, self.metrics)
+
+	def test_daily_vertical(self):
+		"""Rectangles in a vertical day"""
+
+		self.add(0, 9 * 60, 10 * 60)
+		layout = self.layout()
+
+		self.assertEqual(len(layout.headers), 1)
+		self.assertEqual(layout.hours, [(0, 24, 450, 400, True)])
+		self.assertEqual(len(layout.segments), 1)
+		self.assertEqual(layout.segments[0].GetRect(), (50, 24 + 400.0 * 60 / 720, 400.0, 400.0 * 60 / 720))
+		self.assertEqual(len(layout.slotGrid), 24)
+		self.assertEqual(layout.slotGrid.GetSlot(60, 24 + 400.0 / 24 * 2 + 1), (self.day, 9 * 60))
+		self.assertEqual((layout.width, layout.height), (450, 424))
+
+	def test_columns(self):
+		"""Overlapping schedules share the column"""
+
+		self.add(0, 9 * 60, 11 * 60)
+		self.add(0, 10 * 60, 12 * 60)
+		layout = self.layout()
+
+		self.assertEqual([(segment.x, segment.w) for segment in layout.segments],
+				 [(50, 200.0), (250.0, 200.0)])
+
+	def test_weekly_clipping(self):
+		"""A schedule spanning midnight is cut in two"""
+
+		schedule = self.add(1, 20 * 60, 26 * 60)
+		layout = self.layout(viewType=2, width=1030)
+
+		self.assertEqual(len(layout.periods), 7)
+		segments = [segment for segment in layout.segments if segment.schedule is schedule]
+		self.assertEqual([(segment.period, segment.clipStart, segment.clipEnd) for segment in segments],
+				 [(1, False, True), (2, True, False)])
+		self.assertEqual(segments[1].end, (self.day + 2) * 86400 + 2 * 3600)
+
+	def test_horizontal_rows(self):
+		"""Overlapping schedules are on separate rows in horizontal style"""
+
+		self.add(0, 9 * 60, 11 * 60)
+		self.add(0, 10 * 60, 12 * 60)
+		self.add(0, 11 * 60, 13 * 60)
+		layout = self.layout(style=1)
+
+		rows = sorted(set([segment.y for segment in layout.segments]))
+		self.assertEqual(len(rows), 2)
+		self.assertEqual(rows[1] - rows[0], 29)
+		self.assertEqual(layout.height, 24 + 21 + 2 * 29)
+
+	def test_pages(self):
+		"""Rows are distributed on pages"""
+
+		for idx in range(10):
+			self.add(0, 9 * 60, 10 * 60)
+		layout = self.layout(style=1, pageHeight=150)
+
+		self.assertEqual(layout.pageCount, 3)
+		self.assertEqual(len(layout.schedulePages), 10)
+
+		state = dict(style=1, pageHeight=150, pageNumber=2, schedulePages=layout.schedulePages)
+		page = self.layout(**state)
+		self.assertEqual(len(page.segments), len([1 for pageNo in layout.schedulePages.values() if pageNo == 2]))
+		self.assertEqual(page.pageCount, None)
+
+	def test_monthly(self):
+		"""Month cells"""
+
+		self.add(2, 9 * 60, 10 * 60)
+		layout = self.layout(viewType=3, width=700, height=524)
+
+		# February 2010 starts on Monday and fits in 4 weeks
+		self.assertEqual(len(layout.cells), 28)
+		self.assertEqual([cell[0] for cell in layout.cells if cell[5]], [self.day + 2])
+		self.assertEqual(layout.cells[0][1:5], (0, 24, 100.0, 125.0))
+		self.assertEqual(layout.slotGrid.GetSlot(350, 300), (self.day + 17, 0))
+
+	def test_placed_cells(self):
+		"""Cells placed once stay recorded when the layout is reused"""
+
+		schedule = self.add(2, 9 * 60, 10 * 60)
+		cache = wxLayoutCache()
+		cache.Put('month', self.layout(viewType=3, width=700, height=524))
+
+		layout = cache.Get('month')
+		index = [cell[0] for cell in layout.cells].index(self.day + 2)
+		self.assertEqual(layout.GetPlacedCells(), [])
+		self.assertTrue(layout.PlaceCell(index, [(schedule, 200, 170, 300, 185)]))
+
+		# Refreshing with the cached layout draws from cached tiles:
+		# the cell is not placed again, but its schedules still are.
+		layout = cache.Get('month')
+		self.assertEqual(layout.GetPlacedCells(), [(schedule, 200, 170, 300, 185)])
+		self.assertFalse(layout.PlaceCell(index, [(schedule, 0, 0, 1, 1)]))
+		self.assertEqual(layout.GetPlacedCells(), [(schedule, 200, 170, 300, 185)])
+
+		self.assertEqual(self.layout(viewType=3, width=700, height=524).GetPlacedCells(), [])
+
+	def test_relayout(self):
+		"""Laying out the columns of a moved schedule again gives the full layout"""
+
+		moved = self.add(1, 9 * 60, 11 * 60)
+		self.add(1, 10 * 60, 12 * 60)
+		self.add(3, 10 * 60, 12 * 60)
+		self.add(5, 8 * 60, 9 * 60)
+		layout = self.layout(viewType=2, width=1030)
+		self.assertTrue(layout.IsIncremental())
+
+		previous = self.index.GetInterval(moved)
+		self.index.Update(moved, (self.day + 3) * 86400 + 9 * 3600, (self.day + 3) * 86400 + 11 * 3600)
+		periods = layout.GetPeriodsInRange(*previous) + layout.GetPeriodsInRange(*self.index.GetInterval(moved))
+		self.assertEqual(periods, [1, 3])
+
+		relayoutPeriods(layout, self.index.QueryIntervals, self.metrics, periods)
+		expected = self.layout(viewType=2, width=1030)
+
+		rects = lambda layout: [(id(segment.schedule), segment.period, segment.GetRect()) for segment in layout.segments]
+		self.assertEqual(rects(layout), rects(expected))
+
+	def test_buckets(self):
+		"""Weekly and monthly views query schedules once"""
+
+		long = self.add(1, 20 * 60, 3 * 24 * 60)
+		self.add(2, 9 * 60, 10 * 60)
+
+		queries = []
+		def source(start, end):
+			queries.append((start, end))
+			return self.index.QueryIntervals(start, end)
+
+		state = wxLayoutState(viewType=2, day=self.day, today=0, width=1030, height=424)
+		layout = computeLayout(state, source, self.metrics)
+		self.assertEqual(len(queries), 1)
+
+		segments = [segment for segment in layout.segments if segment.schedule is long]
+		self.assertEqual([(segment.period, segment.clipStart, segment.clipEnd) for segment in segments],
+				 [(1, False, True), (2, True, True), (3, True, False), (4, True, False)])
+		# Ends at midnight: an empty segment on day 4, as before
+		self.assertEqual(segments[-1].start, segments[-1].end)
+
+		del queries[:]
+		state = wxLayoutState(viewType=3, day=self.day, today=0, width=700, height=524)
+		layout = computeLayout(state, source, self.metrics)
+		self.assertEqual(len(queries), 1)
+		self.assertEqual(len([cell for cell in layout.cells if cell[5]]), 4)
+
+	def test_not_incremental(self):
+		self.assertFalse(self.layout(style=1).IsIncremental())
+		self.assertFalse(self.layout(viewType=3).IsIncremental())
+
+	def test_headers(self):
+		"""Header panel layout"""
+
+		state = wxLayoutState(viewType=2, style=1, day=self.day + 3, periodCount=2, drawHeaders=False)
+		layout = computeHeaderLayout(state, self.metrics, 0, 1400, 36)
+
+		self.assertEqual([header[1] for header in layout.headers], list(range(self.day, self.day + 14)))
+		self.assertEqual(len(layout.headerBounds), 14)
+		self.assertEqual(layout.height, 24)
+
+
+class TestLayoutCache(unittest.TestCase):
+	def test_key(self):
+		"""Equal states have equal keys"""
+
+		first = wxLayoutState(day=10, workingHours=[(480, 720), (780, 1080)])
+		second = wxLayoutState(day=10, workingHours=[(480, 720), (780, 1080)], schedulePages={1: 2})
+		self.assertEqual(first.Key(), second.Key())
+		self.assertNotEqual(first.Key(), wxLayoutState(day=11).Key())
+		self.assertEqual(hash(wxLayoutState(workingHours={1: [(480, 720)]}).Key()),
+				 hash(wxLayoutState(workingHours={1: [(480, 720)]}).Key()))
+
+	def test_unknown_parameter(self):
+		self.assertRaises(TypeError, wxLayoutState, dayz=10)
+
+	def test_lru(self):
+		"""Least recently used layouts are evicted"""
+
+		cache = wxLayoutCache(maxSize=2)
+		cache.Put('a', 1)
+		cache.Put('b', 2)
+		self.assertEqual(cache.Get('a'), 1)
+		cache.Put('c', 3)
+		self.assertEqual(cache.Get('b'), None)
+		self.assertEqual(cache.Get('a'), 1)
+		self.assertEqual(cache.Get('c'), 3)
+		self.assertEqual(len(cache), 2)
+
+		cache.Clear()
+		self.assertEqual(cache.Get('a'), None)
+
+
+class TestTileCache(unittest.TestCase):
+	def test_keys(self):
+		"""Tiles intersecting a rectangle"""
+
+		cache = wxTileCache(tileSize=100)
+
+		self.assertEqual(cache.GetTileKeys(0, 0, 100, 100), [(0, 0)])
+		self.assertEqual(cache.GetTileKeys(50, 150, 100, 60), [(0, 1), (1, 1), (0, 2), (1, 2)])
+		self.assertEqual(cache.GetTileKeys(0, 0, 0, 100), [])
+		self.assertEqual(cache.GetTileRect((2, 1)), (200, 100, 100, 100))
+
+	def test_budget(self):
+		"""Least recently used tiles are dropped beyond the budget"""
+
+		cache = wxTileCache(tileSize=100, budget=300)
+		for column in range(3):
+			cache.Put((column, 0), column, 100)
+		cache.Get((0, 0))
+		cache.Put((3, 0), 3, 100)
+
+		self.assertEqual(cache.GetTotal(), 300)
+		self.assertFalse((1, 0) in cache)
+		self.assertEqual(cache.Get((0, 0)), 0)
+
+		cache.SetBudget(100)
+		self.assertEqual(len(cache), 1)
+		self.assertEqual(cache.Get((0, 0)), 0)
+
+	def test_invalidate(self):
+		"""Only the tiles intersecting a change are dropped"""
+
+		cache = wxTileCache(tileSize=100)
+		for key in cache.GetTileKeys(0, 0, 300, 300):
+			cache.Put(key, None, 1)
+		cache.InvalidateRect(150, 50, 10, 100)
+
+		self.assertEqual(len(cache), 7)
+		self.assertFalse((1, 0) in cache)
+		self.assertFalse((1, 1) in cache)
+		self.assertEqual(cache.GetTotal(), 7)
+
+
+class TestTextMetrics(unittest.TestCase):
+	def setUp(self):
+		self.measured = []
+
+	def measure(self, text):
+		self.measured.append(text)
+		return len(text) * 5, 10
+
+	def test_cache(self):
+		"""Texts are measured once per font"""
+
+		metrics = wxTextMetrics()
+
+		self.assertEqual(metrics.GetTextExtent('a', 'abc', self.measure), (15, 10))
+		self.assertEqual(metrics.GetTextExtent('a', 'abc', self.measure), (15, 10))
+		metrics.GetTextExtent('b', 'abc', self.measure)
+
+		self.assertEqual(self.measured, ['abc', 'abc'])
+
+		metrics.Clear()
+		metrics.GetTextExtent('a', 'abc', self.measure)
+		self.assertEqual(len(self.measured), 3)
+
+	def test_paragraph(self):
+		"""Words are wrapped and justified"""
+
+		paragraph = layoutParagraph(u'aa bb cc dd', 0, 40, 5, self.measure)
+
+		# 'aa bb' is spread on the first line, 'cc dd' fits on the second
+		self.assertEqual(paragraph.lines, [(0, 10, [(u'aa', 0.0), (u'bb', 30.0)], True),
+						   (15, 10, [(u'cc dd', 5)], False)])
+		self.assertEqual(paragraph.height, 30)
+
+	def test_paragraph_cache(self):
+		"""Paragraphs are wrapped once per font and width"""
+
+		metrics = wxTextMetrics()
+		first = metrics.GetParagraph('a', u'aa bb', 0, 100, 5, self.measure)
+		count = len(self.measured)
+
+		self.assertTrue(metrics.GetParagraph('a', u'aa bb', 0, 100, 5, self.measure) is first)
+		self.assertEqual(len(self.measured), count)
+		self.assertFalse(metrics.GetParagraph('a', u'aa bb', 0, 20, 5, self.measure) is first)
+
+	def test_lru(self):
+		"""Least recently used extents are dropped"""
+
+		metrics = wxTextMetrics(maxSize=2)
+		metrics.GetTextExtent('a', 'x', self.measure)
+		metrics.GetTextExtent('a', 'y', self.measure)
+		metrics.GetTextExtent('a', 'x', self.measure)
+		metrics.GetTextExtent('a', 'z', self.measure)
+
+		self.assertEqual(len(metrics), 2)
+		self.assertTrue(('a', 'x') in metrics)
+		self.assertFalse(('a', 'y') in metrics)
+
+
+def suite():
+	s = unittest.TestSuite()
+
+	s.addTest(unittest.makeSuite(TestScheduleIndex, 'test'))
+	s.addTest(unittest.makeSuite(TestPackColumns, 'test'))
+	s.addTest(unittest.makeSuite(TestPackRows, 'test'))
+	s.addTest(unittest.makeSuite(TestPackChains, 'test'))
+	s.addTest(unittest.makeSuite(TestTimeAxis, 'test'))
+	s.addTest(unittest.makeSuite(TestSlotGrid, 'test'))
+	s.addTest(unittest.makeSuite(TestSpatialIndex, 'test'))
+	s.addTest(unittest.makeSuite(TestLayout, 'test'))
+	s.addTest(unittest.makeSuite(TestLayoutCache, 'test'))
+	s.addTest(unittest.makeSuite(TestTileCache, 'test'))
+	s.addTest(unittest.makeSuite(TestTextMetrics, 'test'))
+
+	return s
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,8 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from wxFontManager import wxFontManager
+from wxResourcePool import wxResourcePool
 from wxSchedulerConstants import *
-from wxScheduleUtils import copyDateTime
+from wxScheduleUtils import copyDateTime, dateTimeToSeconds, makeTimeAxis, ordinalToDate
+from wxTimeAxis import wxTimeAxis
+from wxTextMetrics import wxTextMetrics
 from wxTimeFormat import wxTimeFormat
 
 import wx, math
@@ -17,32 +21,74 @@ class wxDrawer(object):
 	# wx.GraphicsContext instead of wx.DC.
 	use_gc = False
 
+	# Text extents, derived fonts and fitted sizes, shared by all drawers
+	textMetrics = wxTextMetrics(TEXT_METRICS_CACHE_SIZE)
+	fonts = wxFontManager(FONT_CACHE_SIZE)
+
 	def __init__(self, context, displayedHours):
 		self.context = context
 		self.displayedHours = displayedHours
+		self.resources = wxResourcePool(context)
+
+		# The scheduler sets wx.NORMAL_FONT on the context
+		if self.use_gc:
+			self._font = wx.NORMAL_FONT
+		else:
+			self._font = context.GetFont()
+		self._fontColour = None
+		self._fontKey = self._makeFontKey(self._font)
+
+	def _makeFontKey(self, font):
+		return (self.use_gc, font.GetNativeFontInfoDesc(), font.GetPointSize())
+
+	def _setFont(self, font, colour=None):
+		"""
+		Sets the font of the context (and the text colour, with a
+		GraphicsContext); text is measured in it from now on.
+		"""
+		if colour is None:
+			self.context.SetFont(font)
+		else:
+			self.context.SetFont(font, colour)
+		self._font = font
+		self._fontColour = colour
+		self._fontKey = self._makeFontKey(font)
+
+	def _textExtent(self, text):
+		"""
+		Returns the extent of 'text' in the current font, from the
+		shared cache when it was already measured.
+		"""
+		return self.textMetrics.GetTextExtent(self._fontKey, text, self.context.GetTextExtent)
 
 	def AdjustFontForHeight(self, font, height):
-		pointSize = 18
-		while True:
-			font.SetPointSize( pointSize )
-			_, th = self.context.GetTextExtent(' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ))
-			if th <= height:
-				return
-			pointSize -= 1
-			if pointSize == 1:
-				return # Hum
+		"""
+		Sets the point size of 'font' to the largest one, up to 18,
+		at which an hour label is at most 'height' pixels high.
+		"""
+		previous, colour = self._font, self._fontColour
+		pointSize = self._fitHourFont( font, height=height )
+		if self._font is not previous:
+			# Measured in other fonts
+			self._setFont( previous, colour )
+		font.SetPointSize( pointSize )
 
 	def AdjustFontForWidth(self, font, width):
-		pointSize = 18
-		while True:
-			font.SetPointSize( pointSize )
-			self.context.SetFont( font )
-			tw, _ = self.context.GetTextExtent(' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ))
-			if tw <= width:
-				return
-			pointSize -= 1
-			if pointSize == 1:
-				return # Hum
+		"""
+		Sets the point size of 'font' to the largest one, up to 18,
+		at which an hour label is at most 'width' pixels wide, and
+		sets it on the context.
+		"""
+		font.SetPointSize( self._fitHourFont( font, width=width ) )
+		self._setFont( font )
+
+	def _fitHourFont(self, font, width=None, height=None):
+		return self.fonts.GetFittedSize(font, ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ),
+						width, height, self._measureInFont, self.use_gc)
+
+	def _measureInFont(self, font, text):
+		self._setFont(font)
+		return self._textExtent(text)
 
 	def DrawDayHeader(self, day, x, y, w, h, highlight=None):
 		"""
@@ -95,9 +141,50 @@ class wxDrawer(object):
 		"""
 		raise NotImplementedError
 
+	def GetDayHeaderHeight(self, day):
+		"""
+		Returns the height DrawDayHeader would draw.
+		"""
+		raise NotImplementedError
+
+	def GetMonthHeaderHeight(self, day):
+		"""
+		Returns the height DrawMonthHeader would draw.
+		"""
+		raise NotImplementedError
+
+	def GetSimpleDayHeaderHeight(self, day):
+		"""
+		Returns the height DrawSimpleDayHeader would draw.
+		"""
+		raise NotImplementedError
+
+	def GetHoursHeight(self, w, includeText=True):
+		"""
+		Returns the height of the hours drawn horizontally by
+		DrawHours in a 'w' pixels wide rectangle.
+		"""
+		raise NotImplementedError
+
+	def GetScheduleHeight(self, schedule, w):
+		"""
+		Returns the height a schedule needs to be drawn in 'w'
+		pixels, without drawing it.
+		"""
+		return self._DrawSchedule(schedule, 0, 0, w, None)
+
+	def DrawSchedule(self, schedule, x, y, w, h):
+		"""
+		Draws a schedule in  the specified rectangle, outside
+		margin included, as given by the layout.
+		"""
+		self._DrawSchedule(schedule, x + SCHEDULE_OUTSIDE_MARGIN, y + SCHEDULE_OUTSIDE_MARGIN,
+				   w - 2 * SCHEDULE_OUTSIDE_MARGIN, h - 2 * SCHEDULE_OUTSIDE_MARGIN)
+
 	def _DrawSchedule(self, schedule, x, y, w, h):
 		"""
-		Draws a schedule in the specified rectangle.
+		Draws a schedule in the specified rectangle. If 'h' is
+		None, nothing is drawn and the needed height is returned.
 		"""
 
 		offsetY = SCHEDULE_INSIDE_MARGIN
@@ -105,8 +192,7 @@ class wxDrawer(object):
 
 		if self.use_gc:
 			if h is not None:
-				pen = wx.Pen(schedule.color)
-				self.context.SetPen(self.context.CreatePen(pen))
+				self.context.SetPen(self.resources.GetGraphicsPen(schedule.color))
 
 				brush = self.context.CreateLinearGradientBrush(x, y, x + w, y + h, schedule.color, SCHEDULER_BACKGROUND_BRUSH())
 				self.context.SetBrush(brush)
@@ -114,8 +200,8 @@ class wxDrawer(object):
 
 			if schedule.complete is not None:
 				if h is not None:
-					self.context.SetPen(self.context.CreatePen(wx.Pen(wx.SystemSettings.GetColour(wx.SYS_COLOUR_SCROLLBAR))))
-					self.context.SetBrush(self.context.CreateBrush(wx.Brush(wx.SystemSettings.GetColour(wx.SYS_COLOUR_SCROLLBAR))))
+					self.context.SetPen(self.resources.GetGraphicsPen(SYSTEM_COLOUR(wx.SYS_COLOUR_SCROLLBAR)))
+					self.context.SetBrush(self.resources.GetGraphicsBrush(SYSTEM_COLOUR(wx.SYS_COLOUR_SCROLLBAR)))
 					self.context.DrawRoundedRectangle(x + SCHEDULE_INSIDE_MARGIN, y + offsetY,
 									  w - 2 * SCHEDULE_INSIDE_MARGIN, 2 * SCHEDULE_INSIDE_MARGIN, SCHEDULE_INSIDE_MARGIN)
 
@@ -142,23 +228,23 @@ class wxDrawer(object):
 						break
 
 			font = schedule.font
-			self.context.SetFont(font, schedule.foreground)
+			self._setFont(font, schedule.foreground)
 			offsetY += self._drawTextInRect( self.context, schedule.description, offsetX,
 							 x, y + offsetY, w - 2 * SCHEDULE_INSIDE_MARGIN, None if h is None else h - offsetY - SCHEDULE_INSIDE_MARGIN )
 		else:
 			if h is not None:
-				self.context.SetBrush(wx.Brush(schedule.color))
+				self.context.SetBrush(self.resources.GetBrush(schedule.color))
 				self.context.DrawRectangle(x, y, w, h)
 
 			if schedule.complete is not None:
 				if h is not None:
-					self.context.SetPen(wx.Pen(wx.SystemSettings.GetColour(wx.SYS_COLOUR_SCROLLBAR)))
-					self.context.SetBrush(wx.Brush(wx.SystemSettings.GetColour(wx.SYS_COLOUR_SCROLLBAR)))
+					self.context.SetPen(self.resources.GetPen(SYSTEM_COLOUR(wx.SYS_COLOUR_SCROLLBAR)))
+					self.context.SetBrush(self.resources.GetBrush(SYSTEM_COLOUR(wx.SYS_COLOUR_SCROLLBAR)))
 					self.context.DrawRectangle(x + SCHEDULE_INSIDE_MARGIN, y + offsetY,
 								   w - 2 * SCHEDULE_INSIDE_MARGIN, 10)
 					if schedule.complete:
-						self.context.SetPen(wx.Pen(wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHT)))
-						self.context.SetBrush(wx.Brush(wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHT)))
+						self.context.SetPen(self.resources.GetPen(SYSTEM_COLOUR(wx.SYS_COLOUR_HIGHLIGHT)))
+						self.context.SetBrush(self.resources.GetBrush(SYSTEM_COLOUR(wx.SYS_COLOUR_HIGHLIGHT)))
 						self.context.DrawRectangle(x + SCHEDULE_INSIDE_MARGIN, y + offsetY,
 									   int((w - 2 * SCHEDULE_INSIDE_MARGIN) * schedule.complete), 10)
 
@@ -176,7 +262,7 @@ class wxDrawer(object):
 						break
 
 			font = schedule.font
-			self.context.SetFont(font)
+			self._setFont(font)
 
 			self.context.SetTextForeground( schedule.foreground )
 			offsetY += self._drawTextInRect( self.context, schedule.description, offsetX,
@@ -187,18 +273,21 @@ class wxDrawer(object):
 
 		return offsetY
 
-	def DrawScheduleVertical(self, schedule, day, workingHours, x, y, width, height):
-		"""Draws a schedule vertically."""
+	def DrawScheduleVertical(self, schedule, day, workingHours, x, y, width, height, geometry=None):
+		"""Draws a schedule vertically. 'geometry' may hold the
+		(size, position, total) already computed by ScheduleSize."""
 
-		size, position, total = self.ScheduleSize(schedule, workingHours, day, 1)
+		if geometry is None:
+			geometry = self.ScheduleSize(schedule, workingHours, day, 1)
+		size, position, total = geometry
 
 		if self.use_gc:
 			font = schedule.font
-			self.context.SetFont(font, schedule.color)
+			self._setFont(font, schedule.color)
 		else:
 			font = schedule.font
 			self.context.SetTextForeground( schedule.foreground )
-			self.context.SetFont(font)
+			self._setFont(font)
 
 		y = y + position * height / total + SCHEDULE_OUTSIDE_MARGIN
 		x += SCHEDULE_OUTSIDE_MARGIN
@@ -209,23 +298,26 @@ class wxDrawer(object):
 		return (x - SCHEDULE_OUTSIDE_MARGIN, y - SCHEDULE_OUTSIDE_MARGIN,
 			width + 2 * SCHEDULE_OUTSIDE_MARGIN, height + 2 * SCHEDULE_OUTSIDE_MARGIN)
 
-	def DrawScheduleHorizontal(self, schedule, day, daysCount, workingHours, x, y, width, height):
-		"""Draws a schedule horizontally."""
+	def DrawScheduleHorizontal(self, schedule, day, daysCount, workingHours, x, y, width, height, geometry=None):
+		"""Draws a schedule horizontally. 'geometry' may hold the
+		(size, position, total) already computed by ScheduleSize."""
 
-		size, position, total = self.ScheduleSize(schedule, workingHours, day, daysCount)
+		if geometry is None:
+			geometry = self.ScheduleSize(schedule, workingHours, day, daysCount)
+		size, position, total = geometry
 
 		if self.use_gc:
 			font = schedule.font
-			self.context.SetFont(font, schedule.color)
+			self._setFont(font, schedule.color)
 		else:
 			font = schedule.font
 			self.context.SetTextForeground( schedule.color )
-			self.context.SetFont(font)
+			self._setFont(font)
 
 		x = x + position * width / total + SCHEDULE_OUTSIDE_MARGIN
 		width = width * size / total - 2 * SCHEDULE_OUTSIDE_MARGIN
 
-		# Height is variable
+		# Height is variable; drawing reuses the text wrapped to measure it
 		height = self._DrawSchedule( schedule, x, y, width, None )
 		self._DrawSchedule(schedule, x, y, width, height)
 
@@ -239,166 +331,100 @@ class wxDrawer(object):
 		represent time,  according to a set  of working hours.
 		The workingHours  parameter is  a list of  2-tuples of
 		wx.DateTime  objects   defining  intervals  which  are
-		indeed worked.  startPeriod and endPeriod  delimit the
-		period.
-		"""
-
-		totalSpan = 0
-		scheduleSpan = 0
-		position = 0
-
-		totalTime = 0
-		for startHour, endHour in workingHours:
-			totalTime += copyDateTime(endHour).Subtract(startHour).GetMinutes() / 60.0
-
-		for dayNumber in xrange(dayCount):
-			currentDay = copyDateTime(firstDay)
-			currentDay.AddDS(wx.DateSpan(days=dayNumber))
-
-			for startHour, endHour in workingHours:
-				startHourCopy = wx.DateTimeFromDMY(currentDay.GetDay(),
-								   currentDay.GetMonth(),
-								   currentDay.GetYear(),
-								   startHour.GetHour(),
-								   startHour.GetMinute(),
-								   0)
-				endHourCopy = wx.DateTimeFromDMY(currentDay.GetDay(),
-								 currentDay.GetMonth(),
-								 currentDay.GetYear(),
-								 endHour.GetHour(),
-								 endHour.GetMinute(),
-								 0)
-
-				totalSpan += endHourCopy.Subtract(startHourCopy).GetMinutes()
+		indeed worked,  or a dictionary mapping week days to
+		such lists.  firstDay and dayCount  delimit the period.
 
-				localStart = copyDateTime(schedule.start)
-
-				if localStart.IsLaterThan(endHourCopy):
-					position += endHourCopy.Subtract(startHourCopy).GetMinutes()
-					continue
-
-				if startHourCopy.IsLaterThan(localStart):
-					localStart = startHourCopy
-
-				localEnd = copyDateTime(schedule.end)
-
-				if startHourCopy.IsLaterThan(localEnd):
-					continue
-
-				position += localStart.Subtract(startHourCopy).GetMinutes()
-
-				if localEnd.IsLaterThan(endHourCopy):
-					localEnd = endHourCopy
+		workingHours may also be  a wxTimeAxis already built
+		for the period, which is how the scheduler calls it;
+		firstDay and dayCount are then ignored.
+		"""
 
-				scheduleSpan += localEnd.Subtract(localStart).GetMinutes()
+		if isinstance(workingHours, wxTimeAxis):
+			axis = workingHours
+		else:
+			axis = makeTimeAxis(firstDay, dayCount, workingHours)
 
-		return dayCount * totalTime * scheduleSpan / totalSpan, dayCount * totalTime * position / totalSpan, totalTime * dayCount
+		return axis.ScheduleSize(dateTimeToSeconds(schedule.start) // 60,
+					 dateTimeToSeconds(schedule.end) // 60)
 
 	ScheduleSize = staticmethod(ScheduleSize)
 
 	def _drawTextInRect( self, context, text, offsetX, x, y, w, h ):
-		words = text.split()
-		tw, th = context.GetTextExtent( u' '.join(words) )
-
-		if h is not None and th > h + SCHEDULE_INSIDE_MARGIN:
-			return SCHEDULE_INSIDE_MARGIN
-
-		if tw <= w - offsetX:
-			context.DrawText( u' '.join(words), x + offsetX, y )
-			return th + SCHEDULE_INSIDE_MARGIN
-
-		dpyWords = []
-		remaining = w - offsetX
-		totalW = 0
-		spaceW, _ = context.GetTextExtent(u' ')
-
-		for idx, word in enumerate(words):
-			tw, _ = context.GetTextExtent(word)
-			if remaining - tw - spaceW <= 0:
-				break
-			totalW += tw
-			remaining -= tw + spaceW
-			dpyWords.append(word)
-
-		if dpyWords:
-			words = words[idx:]
-
-			currentX = 1.0 * offsetX
-			if len(dpyWords) > 1:
-				if words:
-					spacing = (1.0 * (w - offsetX) - totalW) / (len(dpyWords) - 1)
-				else:
-					spacing = spaceW
-			else:
-				spacing = 0.0
+		"""
+		Draws text wrapped in 'w' pixels, its first line starting at
+		'offsetX', and returns the height it takes. Lines which do not
+		fit in 'h' are left out; when h is None the text is only
+		measured. The wrapping is cached (see wxTextMetrics).
+		"""
+		paragraph = self.textMetrics.GetParagraph(self._fontKey, text, offsetX, w, SCHEDULE_INSIDE_MARGIN,
+							  self._textExtent)
 
-			for word in dpyWords:
-				tw, _ = context.GetTextExtent(word)
-				context.DrawText(word, int(x + currentX), y)
-				currentX += spacing + tw
-		else:
-			if offsetX == SCHEDULE_INSIDE_MARGIN:
-				# Can't display anything...
-				return SCHEDULE_INSIDE_MARGIN
+		if h is not None:
+			for index, (lineY, lineH, words, justified) in enumerate(paragraph.lines):
+				if (index and lineY > h) or lineH > h - lineY + SCHEDULE_INSIDE_MARGIN:
+					break
+
+				for word, wordX in words:
+					if justified:
+						context.DrawText(word, int(x + wordX), y + lineY)
+					else:
+						context.DrawText(word, x + wordX, y + lineY)
 
-		if words:
-			ny = y + SCHEDULE_INSIDE_MARGIN + th
-			if h is not None and ny > y + h:
-				return SCHEDULE_INSIDE_MARGIN
-			th += self._drawTextInRect( context, u' '.join(words), SCHEDULE_INSIDE_MARGIN, x, ny, w, None if h is None else h - (ny - y) )
+		return paragraph.height
 
-		return th + SCHEDULE_INSIDE_MARGIN
+	def _fitText( self, text, width, suffix='' ):
+		"""
+		Returns the length of the longest start of 'text' which, with
+		'suffix' appended, is at most 'width' pixels wide.
+		"""
+		lo, hi = 0, len(text)
+		while lo < hi:
+			middle = (lo + hi + 1) // 2
+			if self._textExtent(text[:middle] + suffix)[0] <= width:
+				lo = middle
+			else:
+				hi = middle - 1
+		return lo
 
-	def _shrinkText( self, dc, text, width, height ):
+	def _shrinkText( self, text, width, height ):
 		"""
-		Truncate text at desired width
+		Wraps text in lines of at most 'width' pixels, as many as fit
+		in 'height' (at least one). Words wider than a line are split;
+		if text is left out, the last line ends with an ellipsis.
 		"""
 		MORE_SIGNAL		 = '...'
 		SEPARATOR		 = " "
 
-		textlist	 = list()	# List returned by this method
-		words	 = list()	# Wordlist for itermediate elaboration
-
-		# Split text in single words and split words when yours width is over 
-		# available width
-		text = text.replace( "\n", " " ).split()
-
-		for word in text:
-			if dc.GetTextExtent( word )[0] > width:
-				# Cycle trought every char until word width is minor or equal
-				# to available width
-				partial = ""
-				
-				for char in word:
-					if dc.GetTextExtent( partial + char )[0] > width:
-						words.append( partial )
-						partial = char
-					else:
-						partial += char
-			else:
-				words.append( word )
+		words = list()
 
-		# Create list of text lines for output
+		for word in text.replace( "\n", " " ).split():
+			while len( word ) > 1 and self._textExtent( word )[0] > width:
+				length = max( 1, self._fitText( word, width ) )
+				words.append( word[:length] )
+				word = word[length:]
+			words.append( word )
+
+		maxLines = max( 1, int( height // max( 1, self._textExtent( SEPARATOR )[1] ) ) )
+
+		textlist = list()
 		textline = list()
 
 		for word in words:
-			if dc.GetTextExtent( SEPARATOR.join( textline + [word] ) )[0] > width:
+			if textline and self._textExtent( SEPARATOR.join( textline + [word] ) )[0] > width:
 				textlist.append( SEPARATOR.join( textline ) )
-				textline = [word]
-
-				# Break if there's no vertical space available
-				if ( len( textlist ) * dc.GetTextExtent( SEPARATOR )[0] ) > height:
-					# Must exists almost one line of description
-					if len( textlist ) > 1:
-						textlist = textlist[: - 1]
+				textline = list()
 
+				if len( textlist ) == maxLines:
 					break
-			else:
-				textline.append( word )
 
-		# Add remained words to text list
-		if len( textline ) > 0:
+			textline.append( word )
+		else:
 			textlist.append( SEPARATOR.join( textline ) )
+			return textlist
+
+		# No vertical space left
+		last = textlist[-1]
+		textlist[-1] = last[:self._fitText( last, width, MORE_SIGNAL )].rstrip() + MORE_SIGNAL
 
 		return textlist
 
@@ -410,7 +436,7 @@ class BackgroundDrawerDCMixin(object):
 
 	def DrawDayBackground(self, x, y, w, h, highlight=None):
 		if highlight is not None:
-			self.context.SetBrush( wx.Brush( highlight ) )
+			self.context.SetBrush( self.resources.GetBrush( highlight ) )
 		else:
 			self.context.SetBrush( wx.TRANSPARENT_BRUSH )
 
@@ -426,17 +452,14 @@ class HeaderDrawerDCMixin(object):
 
 	def _DrawHeader(self, text, x, y, w, h, pointSize=12, weight=wx.FONTWEIGHT_BOLD,
 			alignRight=False, highlight=None):
-		font = self.context.GetFont()
-		font.SetPointSize( pointSize )
-		font.SetWeight( weight )
-		self.context.SetFont( font )
+		self._setFont( self.fonts.GetFont( self.context.GetFont(), pointSize, weight ) )
 
-		textW, textH = self.context.GetTextExtent( text )
+		textW, textH = self._textExtent( text )
 
 		if highlight is not None:
-			self.context.SetBrush( wx.Brush( highlight ) )
+			self.context.SetBrush( self.resources.GetBrush( highlight ) )
 		else:
-			self.context.SetBrush( wx.Brush( SCHEDULER_BACKGROUND_BRUSH() ) )
+			self.context.SetBrush( self.resources.GetBrush( SCHEDULER_BACKGROUND_BRUSH() ) )
 
 		self.context.DrawRectangle( x, y, w, textH * 1.5 )
 
@@ -449,11 +472,18 @@ class HeaderDrawerDCMixin(object):
 
 		return w, textH * 1.5
 
+	def _MeasureHeader(self, text, pointSize=12, weight=wx.FONTWEIGHT_BOLD):
+		self._setFont( self.fonts.GetFont( self.context.GetFont(), pointSize, weight ) )
+
+		_, textH = self._textExtent( text )
+
+		return textH * 1.5
+
 	def DrawSchedulesCompact(self, day, schedules, x, y, width, height, highlightColor):
 		if day is None:
 			self.context.SetBrush(wx.LIGHT_GREY_BRUSH)
 		else:
-			self.context.SetBrush(wx.Brush(DAY_BACKGROUND_BRUSH()))
+			self.context.SetBrush(self.resources.GetBrush(DAY_BACKGROUND_BRUSH()))
 
 		self.context.DrawRectangle(x, y, width, height)
 
@@ -484,13 +514,13 @@ class HeaderDrawerDCMixin(object):
 					description = '%s %s' % (wxTimeFormat.FormatTime(schedule.start, includeMinutes=True), schedule.description)
 				else:
 					description = schedule.description
-				description = self._shrinkText(self.context, description, width - 2 * SCHEDULE_INSIDE_MARGIN, headerH)[0]
+				description = self._shrinkText(description, width - 2 * SCHEDULE_INSIDE_MARGIN, headerH)[0]
 
-				textW, textH = self.context.GetTextExtent(description)
+				textW, textH = self._textExtent(description)
 				if totalHeight + textH > height:
 					break
 
-				self.context.SetBrush(wx.Brush(schedule.color))
+				self.context.SetBrush(self.resources.GetBrush(schedule.color))
 				self.context.DrawRectangle(x, y, width, textH * 1.2)
 				results.append((schedule, wx.Point(x, y), wx.Point(x + width, y + textH * 1.2)))
 
@@ -514,9 +544,9 @@ class BackgroundDrawerGCMixin(object):
 										       wx.Colour(128, 128, 128, 128),
 										       wx.Colour(highlight.Red(), highlight.Green(), highlight.Blue(), 128) ) )
 		else:
-			self.context.SetBrush( self.context.CreateBrush( wx.TRANSPARENT_BRUSH ) )
+			self.context.SetBrush( self.resources.GetGraphicsBrush( wx.TRANSPARENT_BRUSH ) )
 
-		self.context.SetPen( self.context.CreatePen( FOREGROUND_PEN ) )
+		self.context.SetPen( self.resources.GetGraphicsPen( FOREGROUND_PEN ) )
 
 		self.context.DrawRectangle(x, y - 1, w, h + 1)
 
@@ -528,39 +558,36 @@ class HeaderDrawerGCMixin(object):
 
 	def _DrawHeader(self, text, x, y, w, h, pointSize=12, weight=wx.FONTWEIGHT_BOLD,
 			alignRight=False, highlight=None):
-		font = wx.NORMAL_FONT
-		fsize = font.GetPointSize()
-		fweight = font.GetWeight()
+		self._setFont(self.fonts.GetFont(wx.NORMAL_FONT, pointSize, weight), wx.BLACK)
 
-		try:
-			font.SetPointSize( pointSize )
-			font.SetWeight( weight )
-			self.context.SetFont(font, wx.BLACK)
+		textW, textH = self._textExtent( text )
 
-			textW, textH = self.context.GetTextExtent( text )
+		x1 = x
+		y1 = y
+		x2 = x + w
+		y2 = y + textH * 1.5
 
-			x1 = x
-			y1 = y
-			x2 = x + w
-			y2 = y + textH * 1.5
+		if highlight is not None:
+			self.context.SetBrush(self.context.CreateLinearGradientBrush(x1, y1, x2, y2, wx.Colour(128, 128, 128),
+										     highlight))
+		else:
+			self.context.SetBrush(self.context.CreateLinearGradientBrush(x1, y1, x2, y2, wx.Colour(128, 128, 128),
+										     SCHEDULER_BACKGROUND_BRUSH()))
+		self.context.DrawRectangle(x1, y1, x2 - x1, y2 - y1)
 
-			if highlight is not None:
-				self.context.SetBrush(self.context.CreateLinearGradientBrush(x1, y1, x2, y2, wx.Colour(128, 128, 128),
-											     highlight))
-			else:
-				self.context.SetBrush(self.context.CreateLinearGradientBrush(x1, y1, x2, y2, wx.Colour(128, 128, 128),
-											     SCHEDULER_BACKGROUND_BRUSH()))
-			self.context.DrawRectangle(x1, y1, x2 - x1, y2 - y1)
+		if alignRight:
+			self.context.DrawText(text, x + w - 1.5 * textW, y + textH * .25)
+		else:
+			self.context.DrawText(text, x + (w - textW) / 2, y + textH * .25)
 
-			if alignRight:
-				self.context.DrawText(text, x + w - 1.5 * textW, y + textH * .25)
-			else:
-				self.context.DrawText(text, x + (w - textW) / 2, y + textH * .25)
+		return w, textH * 1.5
 
-			return w, textH * 1.5
-		finally:
-			font.SetPointSize(fsize)
-			font.SetWeight(fweight)
+	def _MeasureHeader(self, text, pointSize=12, weight=wx.FONTWEIGHT_BOLD):
+		self._setFont(self.fonts.GetFont(wx.NORMAL_FONT, pointSize, weight), wx.BLACK)
+
+		_, textH = self._textExtent( text )
+
+		return textH * 1.5
 
 	def DrawSchedulesCompact(self, day, schedules, x, y, width, height, highlightColor):
 		if day is None:
@@ -606,9 +633,9 @@ class HeaderDrawerGCMixin(object):
 						description = '%s %s' % (wxTimeFormat.FormatTime(schedule.start, includeMinutes=True), schedule.description)
 					else:
 						description = schedule.description
-					description = self._shrinkText(self.context, description, width - 2 * SCHEDULE_INSIDE_MARGIN, headerH)[0]
+					description = self._shrinkText(description, width - 2 * SCHEDULE_INSIDE_MARGIN, headerH)[0]
 
-					textW, textH = self.context.GetTextExtent(description)
+					textW, textH = self._textExtent(description)
 					if totalHeight + textH > height:
 						break
 
@@ -617,7 +644,7 @@ class HeaderDrawerGCMixin(object):
 					self.context.DrawRoundedRectangle(x, y, width, textH * 1.2, 1.0 * textH / 2)
 					results.append((schedule, wx.Point(x, y), wx.Point(x + width, y + textH * 1.2)))
 
-					self.context.SetFont(schedule.font, schedule.foreground)
+					self._setFont(schedule.font, schedule.foreground)
 					self.context.DrawText(description, x + SCHEDULE_INSIDE_MARGIN, y + textH * 0.1)
 
 					y += textH * 1.2
@@ -634,20 +661,33 @@ class HeaderDrawerMixin(object):
 	A mixin that draws header using the _DrawHeader method.
 	"""
 
+	def _DayHeaderText(self, day):
+		return '%s %s %s' % ( day.GetWeekDayName( day.GetWeekDay() )[:3],
+				      day.GetDay(), day.GetMonthName( day.GetMonth() ) )
+
+	def _MonthHeaderText(self, day):
+		return '%s %s' % ( day.GetMonthName( day.GetMonth() ), day.GetYear() )
+
 	def DrawDayHeader(self, day, x, y, width, height, highlight=None):
-		return self._DrawHeader('%s %s %s' % ( day.GetWeekDayName( day.GetWeekDay() )[:3],
-						       day.GetDay(), day.GetMonthName( day.GetMonth() ) ),
-					x, y, width, height, highlight=highlight)
+		return self._DrawHeader(self._DayHeaderText(day), x, y, width, height, highlight=highlight)
 
 	def DrawMonthHeader(self, day, x, y, w, h):
-		return self._DrawHeader('%s %s' % ( day.GetMonthName( day.GetMonth() ), day.GetYear() ),
-					x, y, w, h)
+		return self._DrawHeader(self._MonthHeaderText(day), x, y, w, h)
 
 	def DrawSimpleDayHeader(self, day, x, y, w, h, highlight=None):
 		return self._DrawHeader(day.Format('%a %d'), x, y, w, h,
 					weight=wx.FONTWEIGHT_NORMAL, alignRight=True,
 					highlight=highlight)
 
+	def GetDayHeaderHeight(self, day):
+		return self._MeasureHeader(self._DayHeaderText(day))
+
+	def GetMonthHeaderHeight(self, day):
+		return self._MeasureHeader(self._MonthHeaderText(day))
+
+	def GetSimpleDayHeaderHeight(self, day):
+		return self._MeasureHeader(day.Format('%a %d'), weight=wx.FONTWEIGHT_NORMAL)
+
 
 class wxBaseDrawer(BackgroundDrawerDCMixin, HeaderDrawerDCMixin, HeaderDrawerMixin, wxDrawer):
 	"""
@@ -656,7 +696,7 @@ class wxBaseDrawer(BackgroundDrawerDCMixin, HeaderDrawerDCMixin, HeaderDrawerMix
 
 	def DrawHours(self, x, y, w, h, direction, includeText=True):
 		if direction == wxSCHEDULER_VERTICAL:
-			self.context.SetBrush(wx.Brush(SCHEDULER_BACKGROUND_BRUSH()))
+			self.context.SetBrush(self.resources.GetBrush(SCHEDULER_BACKGROUND_BRUSH()))
 			self.context.DrawRectangle(x, y, LEFT_COLUMN_SIZE, h)
 
 		font = self.context.GetFont()
@@ -664,17 +704,17 @@ class wxBaseDrawer(BackgroundDrawerDCMixin, HeaderDrawerDCMixin, HeaderDrawerMix
 		fSize = font.GetPointSize()
 		try:
 			font.SetWeight( wx.FONTWEIGHT_NORMAL )
-			self.context.SetFont( font )
+			self._setFont( font )
 			self.context.SetTextForeground( wx.BLACK )
 
 			if direction == wxSCHEDULER_VERTICAL:
 				hourH = 1.0 * h / len(self.displayedHours)
 				self.AdjustFontForHeight( font, hourH )
-				hourW, _ = self.context.GetTextExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
+				hourW, _ = self._textExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
 			else:
 				hourW = 1.0 * w / len(self.displayedHours)
 				self.AdjustFontForWidth( font, int(hourW * 2 * 0.9) )
-				_, hourH = self.context.GetTextExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
+				_, hourH = self._textExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
 
 			if not includeText:
 				hourH = 0
@@ -705,15 +745,33 @@ class wxBaseDrawer(BackgroundDrawerDCMixin, HeaderDrawerDCMixin, HeaderDrawerMix
 			font.SetWeight( fWeight )
 			font.SetPointSize( fSize )
 
+	def GetHoursHeight(self, w, includeText=True):
+		if not includeText:
+			return 0
+
+		previous = self.context.GetFont()
+		font = self.context.GetFont()
+		try:
+			font.SetWeight( wx.FONTWEIGHT_NORMAL )
+			self._setFont( font )
+
+			hourW = 1.0 * w / len(self.displayedHours)
+			self.AdjustFontForWidth( font, int(hourW * 2 * 0.9) )
+			_, hourH = self._textExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
+
+			return hourH * 1.5
+		finally:
+			self._setFont( previous )
+
 	def DrawNowHorizontal(self, x, y, w):
-		self.context.SetBrush( wx.Brush( wx.Colour( 0, 128, 0 ) ) )
-		self.context.SetPen( wx.Pen( wx.Colour( 0, 128, 0 ) ) )
+		self.context.SetBrush( self.resources.GetBrush( wx.Colour( 0, 128, 0 ) ) )
+		self.context.SetPen( self.resources.GetPen( wx.Colour( 0, 128, 0 ) ) )
 		self.context.DrawArc( x, y + 5, x, y - 5, x, y )
 		self.context.DrawRectangle( x, y - 1, w, 3 )
 
 	def DrawNowVertical(self, x, y, h):
-		self.context.SetBrush( wx.Brush( wx.Colour( 0, 128, 0 ) ) )
-		self.context.SetPen( wx.Pen( wx.Colour( 0, 128, 0 ) ) )
+		self.context.SetBrush( self.resources.GetBrush( wx.Colour( 0, 128, 0 ) ) )
+		self.context.SetPen( self.resources.GetPen( wx.Colour( 0, 128, 0 ) ) )
 		self.context.DrawArc( x - 5, y, x + 5, y, x, y )
 		self.context.DrawRectangle( x - 1, y, 3, h )
 
@@ -737,18 +795,18 @@ class wxFancyDrawer(BackgroundDrawerGCMixin, HeaderDrawerGCMixin, HeaderDrawerMi
 
 		try:
 			font.SetWeight(wx.FONTWEIGHT_NORMAL)
-			self.context.SetFont(font, wx.BLACK)
+			self._setFont(font, wx.BLACK)
 
 			self.context.SetPen(FOREGROUND_PEN)
 
 			if direction == wxSCHEDULER_VERTICAL:
 				hourH = 1.0 * h / len(self.displayedHours)
 				self.AdjustFontForHeight( font, hourH )
-				hourW, _ = self.context.GetTextExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
+				hourW, _ = self._textExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
 			else:
 				hourW = 1.0 * w / len(self.displayedHours)
 				self.AdjustFontForWidth( font, int(hourW * 2 * 0.9) )
-				_, hourH = self.context.GetTextExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
+				_, hourH = self._textExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
 
 			if not includeText:
 				hourH = 0
@@ -782,6 +840,27 @@ class wxFancyDrawer(BackgroundDrawerGCMixin, HeaderDrawerGCMixin, HeaderDrawerMi
 			font.SetPointSize( fsize )
 			font.SetWeight( fweight )
 
+	def GetHoursHeight(self, w, includeText=True):
+		if not includeText:
+			return 0
+
+		font = wx.NORMAL_FONT
+		fsize = font.GetPointSize()
+		fweight = font.GetWeight()
+
+		try:
+			font.SetWeight(wx.FONTWEIGHT_NORMAL)
+			self._setFont(font, wx.BLACK)
+
+			hourW = 1.0 * w / len(self.displayedHours)
+			self.AdjustFontForWidth( font, int(hourW * 2 * 0.9) )
+			_, hourH = self._textExtent( ' ' + wxTimeFormat.FormatTime( wx.DateTimeFromHMS(23, 59, 59) ) )
+
+			return hourH * 1.5
+		finally:
+			font.SetPointSize( fsize )
+			font.SetWeight( fweight )
+
 	def DrawNowHorizontal(self, x, y, w):
 		brush = self.context.CreateLinearGradientBrush( x + 4, y - 1, x + w, y + 1, wx.Colour( 0, 128, 0, 128 ), wx.Colour( 0, 255, 0, 128 ) )
 		self.context.SetBrush( brush )
@@ -805,3 +884,28 @@ class wxFancyDrawer(BackgroundDrawerGCMixin, HeaderDrawerGCMixin, HeaderDrawerMi
 		path = self.context.CreatePath()
 		path.AddArc( x, y, 5, 0.0, math.pi, True )
 		self.context.FillPath( path )
+
+
+class wxDrawerMetrics(object):
+	"""
+	Text measurements for the layout engine (see wxSchedulerLayout),
+	made by a drawer.
+	"""
+
+	def __init__(self, drawer):
+		self.drawer = drawer
+
+	def DayHeaderHeight(self, day):
+		return self.drawer.GetDayHeaderHeight(ordinalToDate(day))
+
+	def MonthHeaderHeight(self, day):
+		return self.drawer.GetMonthHeaderHeight(ordinalToDate(day))
+
+	def SimpleDayHeaderHeight(self, day):
+		return self.drawer.GetSimpleDayHeaderHeight(ordinalToDate(day))
+
+	def HoursHeight(self, width, includeText=True):
+		return self.drawer.GetHoursHeight(width, includeText)
+
+	def ScheduleHeight(self, schedule, width):
+		return self.drawer.GetScheduleHeight(schedule, width)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+import wx
+
+
+class wxFontManager(object):
+	"""
+	Fonts shared by the drawers (see wxDrawer.fonts). Fonts derived
+	from a base font with another point size or weight are interned,
+	and the point sizes fitting a text in a box are remembered by
+	base font, text and box size, so that the hour ruler and the
+	headers are only measured on the first paint. The 'maxSize'
+	most recently used fonts and sizes are kept.
+	"""
+
+	def __init__( self, maxSize=256 ):
+		self.maxSize = maxSize
+		self._fonts = OrderedDict()   # Least recently used first
+		self._sizes = OrderedDict()
+
+	def _lookup( self, entries, key, compute ):
+		value = entries.pop( key, None )
+		if value is None:
+			value = compute()
+			if len( entries ) >= self.maxSize:
+				entries.popitem( False )
+
+		entries[ key ] = value
+
+		return value
+
+	def GetFont( self, base, pointSize=None, weight=None ):
+		"""
+		Returns 'base' with the given point size and weight, when not
+		None. The same font is returned for the same arguments, so it
+		must not be modified.
+		"""
+		description = base.GetNativeFontInfoDesc()
+
+		def derive():
+			font = wx.FontFromNativeInfoString( description )
+			if pointSize is not None:
+				font.SetPointSize( pointSize )
+			if weight is not None:
+				font.SetWeight( weight )
+			return font
+
+		return self._lookup( self._fonts, ( description, pointSize, weight ), derive )
+
+	def GetFittedSize( self, base, text, width, height, measure, kind=None, largest=18, smallest=2 ):
+		"""
+		Returns the largest point size between 'smallest' and 'largest'
+		at which 'text' in 'base' is at most 'width' pixels wide and
+		'height' pixels high (None for no limit), or 'smallest'.
+		measure(font, text) returns the extent of a text; it is only
+		called the first time for a given 'kind' of context. The box
+		is rounded down to whole pixels.
+		"""
+		if width is not None:
+			width = int( width )
+		if height is not None:
+			height = int( height )
+
+		def fit():
+			lo, hi = smallest, largest
+			while lo < hi:
+				middle = ( lo + hi + 1 ) // 2
+				textW, textH = measure( self.GetFont( base, middle ), text )
+				if ( width is None or textW <= width ) and ( height is None or textH <= height ):
+					lo = middle
+				else:
+					hi = middle - 1
+			return lo
+
+		return self._lookup( self._sizes, ( kind, base.GetNativeFontInfoDesc(), text, width, height, largest, smallest ),
+				     fit )
+
+	def Clear( self ):
+		self._fonts.clear()
+		self._sizes.clear()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from wxSchedulerConstants import RESOURCE_CACHE_SIZE
+import wx
+
+
+def _colourKey( colour ):
+	return tuple( colour.Get( True ) )
+
+
+class wxResourcePool(object):
+	"""
+	Pens and brushes of a drawing context, by colour and style, so
+	that drawing many schedules of the same colour does not create
+	as many of them. The 'maxSize' most recently used ones of each
+	kind are kept.
+
+	wx.Pen and wx.Brush objects do not depend on the context: they
+	are shared by all pools. The GraphicsContext pens and brushes
+	made of them belong to a context, and are only kept by the pool
+	of 'context'. Gradient brushes depend on the coordinates they
+	are drawn at, so the drawers create them each time.
+	"""
+
+	maxSize = RESOURCE_CACHE_SIZE
+
+	_pens = OrderedDict()   # Least recently used first
+	_brushes = OrderedDict()
+
+	def __init__( self, context=None ):
+		self.context = context
+
+		self._graphicsPens = OrderedDict()
+		self._graphicsBrushes = OrderedDict()
+
+	def _lookup( self, entries, key, compute ):
+		value = entries.pop( key, None )
+		if value is None:
+			value = compute()
+			if len( entries ) >= self.maxSize:
+				entries.popitem( False )
+
+		entries[ key ] = value
+
+		return value
+
+	def GetPen( self, colour, width=1, style=wx.SOLID ):
+		return self._lookup( self._pens, ( _colourKey( colour ), width, style ),
+				     lambda: wx.Pen( colour, width, style ) )
+
+	def GetBrush( self, colour, style=wx.SOLID ):
+		return self._lookup( self._brushes, ( _colourKey( colour ), style ),
+				     lambda: wx.Brush( colour, style ) )
+
+	def GetGraphicsPen( self, pen ):
+		"""
+		Returns the GraphicsContext pen for 'pen', a wx.Pen or a
+		colour.
+		"""
+		if not isinstance( pen, wx.Pen ):
+			pen = self.GetPen( pen )
+
+		return self._lookup( self._graphicsPens, ( _colourKey( pen.GetColour() ), pen.GetWidth(), pen.GetStyle() ),
+				     lambda: self.context.CreatePen( pen ) )
+
+	def GetGraphicsBrush( self, brush ):
+		"""
+		Returns the GraphicsContext brush for 'brush', a wx.Brush or
+		a colour.
+		"""
+		if not isinstance( brush, wx.Brush ):
+			brush = self.GetBrush( brush )
+
+		return self._lookup( self._graphicsBrushes, ( _colourKey( brush.GetColour() ), brush.GetStyle() ),
+				     lambda: self.context.CreateBrush( brush ) )
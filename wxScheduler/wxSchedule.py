@@ -52,6 +52,9 @@ class wxSchedule( wx.EvtHandler ):
 		self._icons			= []
 		self._complete = None
 		self._id = '%.f-%s' % (time.time(), id(self))
+
+		# Last rectangle this schedule was drawn in, set by the drawers
+		self.bounds = None
 		
 		# Need for freeze the event notification
 		self._freeze = False
@@ -197,7 +200,8 @@ class wxSchedule( wx.EvtHandler ):
 		else:
 			self._font = font
 
-		self._eventNotification()
+		# Text size, hence horizontal row heights, may change
+		self._eventNotification( True )
 
 	def GetFont( self ):
 		"""
@@ -348,3 +352,37 @@ class wxSchedule( wx.EvtHandler ):
 	icons = property( GetIcons, SetIcons )
 	complete = property( GetComplete, SetComplete )
 	id = property( GetId, SetId )
+
+
+class wxScheduleView( object ):
+	"""
+	Read-only view on a wxSchedule, with start and end clipped to the
+	painted period. The painter hands these to the drawers instead of
+	Clone()'d schedules, so no wx.EvtHandler is created per visible
+	schedule. Like the clones it replaces, its clientdata is the
+	original schedule; other attributes are read from the original.
+	"""
+
+	__slots__ = ( '_schedule', '_start', '_end' )
+
+	def __init__( self, schedule, start=None, end=None ):
+		self._schedule = schedule
+		self._start = schedule.start if start is None else start
+		self._end = schedule.end if end is None else end
+
+	def __getattr__( self, name ):
+		return getattr( self._schedule, name )
+
+	def GetStart( self ):
+		return self._start
+
+	def GetEnd( self ):
+		return self._end
+
+	def GetClientData( self ):
+		return self._schedule
+
+	start = property( GetStart )
+	end = property( GetEnd )
+	clientdata = property( GetClientData )
+	schedule = property( GetClientData )
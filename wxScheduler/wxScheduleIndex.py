@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left, bisect_right, insort
+
+
+class wxScheduleIndex(object):
+	"""
+	Interval index used by wxSchedulerCore to find the schedules
+	overlapping a period without scanning all of them.
+
+	Items are stored with integer start and end keys (see
+	wxScheduleUtils.dateTimeToSeconds). Internally they are kept
+	sorted by start in chunks of at most 2 * 'chunkSize' entries,
+	each knowing the greatest end of its entries, so that a query
+	skips the chunks ending before it. Adding, updating or removing
+	an item inserts or deletes it in its chunk, and only updates the
+	greatest end of that chunk. Load() adds many items at once: the
+	chunks are then rebuilt on the next query, with a single sort.
+
+	This module does not depend on wx.
+	"""
+
+	chunkSize = 64
+
+	def __init__( self ):
+		self._intervals = {}
+		self._sequence = 0
+
+		# Entries are (start, sequence, end, item) tuples; the
+		# sequence makes them unique, so items are never compared.
+		self._chunks = []
+		self._firsts = []     # (start, sequence) of each chunk's first entry
+		self._maxEnds = []
+		self._dirty = False
+
+	def __len__( self ):
+		return len( self._intervals )
+
+	def __contains__( self, item ):
+		return id( item ) in self._intervals
+
+	def _store( self, item, start, end ):
+		key = id( item )
+
+		current = self._intervals.get( key, None )
+		if current is not None:
+			if current[0] == start and current[1] == end:
+				return None, None
+			sequence = current[2]
+		else:
+			sequence = self._sequence
+			self._sequence += 1
+
+		interval = self._intervals[ key ] = ( start, end, sequence, item )
+		return current, interval
+
+	def Add( self, item, start, end ):
+		"""
+		Adds or updates an item. Returns True if the index changed.
+		"""
+		current, interval = self._store( item, start, end )
+		if interval is None:
+			return False
+
+		if not self._dirty:
+			if current is not None:
+				self._delete( current )
+			self._insert( interval )
+		return True
+
+	Update = Add
+
+	def Load( self, intervals ):
+		"""
+		Adds or updates many (item, start, end) at once.
+		"""
+		for item, start, end in intervals:
+			if self._store( item, start, end )[1] is not None:
+				self._dirty = True
+
+	def Remove( self, item ):
+		"""
+		Removes an item from the index. Unknown items are ignored.
+		"""
+		interval = self._intervals.pop( id( item ), None )
+		if interval is not None and not self._dirty:
+			self._delete( interval )
+
+	def Clear( self ):
+		self._intervals = {}
+		self._chunks = []
+		self._firsts = []
+		self._maxEnds = []
+		self._dirty = False
+
+	def GetInterval( self, item ):
+		"""
+		Returns the (start, end) keys stored for an item, or None.
+		"""
+		interval = self._intervals.get( id( item ), None )
+		if interval is None:
+			return None
+		return interval[0], interval[1]
+
+	def Query( self, start, end ):
+		"""
+		Returns the items whose interval intersects [start, end],
+		bounds included, sorted by start then insertion order.
+		"""
+		return [ item for item, _, _ in self.QueryIntervals( start, end ) ]
+
+	def QueryIntervals( self, start, end ):
+		"""
+		Same as Query, but returns (item, start, end) tuples.
+		"""
+		if self._dirty:
+			self._build()
+
+		results = []
+		for index, chunk in enumerate( self._chunks ):
+			if self._firsts[ index ][0] > end:
+				break
+			if self._maxEnds[ index ] < start:
+				continue
+
+			for entry in chunk[ :bisect_right( chunk, ( end, float( 'inf' ) ) ) ]:
+				if entry[2] >= start:
+					results.append( ( entry[3], entry[0], entry[2] ) )
+
+		return results
+
+	def _build( self ):
+		entries = [ ( start, sequence, end, item ) for start, end, sequence, item in self._intervals.values() ]
+		entries.sort( key=lambda entry: entry[:2] )
+
+		self._chunks = [ entries[ index:index + self.chunkSize ]
+				 for index in range( 0, len( entries ), self.chunkSize ) ]
+		self._firsts = [ chunk[0][:2] for chunk in self._chunks ]
+		self._maxEnds = [ max( entry[2] for entry in chunk ) for chunk in self._chunks ]
+		self._dirty = False
+
+	def _locate( self, key ):
+		"""
+		Returns the index of the chunk where an entry starting with
+		'key', a (start, sequence) pair, goes.
+		"""
+		return max( bisect_right( self._firsts, key ) - 1, 0 )
+
+	def _insert( self, interval ):
+		start, end, sequence, item = interval
+
+		if not self._chunks:
+			self._chunks.append( [ ( start, sequence, end, item ) ] )
+			self._firsts.append( ( start, sequence ) )
+			self._maxEnds.append( end )
+			return
+
+		index = self._locate( ( start, sequence ) )
+		chunk = self._chunks[ index ]
+		insort( chunk, ( start, sequence, end, item ) )
+		self._firsts[ index ] = chunk[0][:2]
+		self._maxEnds[ index ] = max( self._maxEnds[ index ], end )
+
+		if len( chunk ) > 2 * self.chunkSize:
+			# Split the chunk in two halves
+			tail = chunk[ self.chunkSize: ]
+			del chunk[ self.chunkSize: ]
+			self._chunks.insert( index + 1, tail )
+			self._firsts.insert( index + 1, tail[0][:2] )
+			self._maxEnds.insert( index + 1, max( entry[2] for entry in tail ) )
+			self._maxEnds[ index ] = max( entry[2] for entry in chunk )
+
+	def _delete( self, interval ):
+		start, end, sequence, item = interval
+
+		key = ( start, sequence )
+		index = self._locate( key )
+		chunk = self._chunks[ index ]
+		del chunk[ bisect_left( chunk, key ) ]
+
+		if not chunk:
+			del self._chunks[ index ]
+			del self._firsts[ index ]
+			del self._maxEnds[ index ]
+			return
+
+		self._firsts[ index ] = chunk[0][:2]
+		if end == self._maxEnds[ index ]:
+			self._maxEnds[ index ] = max( entry[2] for entry in chunk )
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import heapq
+
+
+def packColumns( intervals ):
+	"""
+	Assigns  columns to  a  list  of (start,  end)  intervals so  that
+	overlapping intervals never share a column. This is a sweep  line:
+	intervals are sorted once, and those overlapping each other either
+	directly or through a chain form a  cluster, which gets its own
+	number of columns.  An interval  that overlaps nothing is alone in
+	its cluster and may use the full width.
+
+	Intervals that  merely  touch  (one  ends  when  the other starts)
+	do not overlap.
+
+	Returns a list of (column, columnCount) tuples, in the order of
+	the input intervals.
+	"""
+
+	order = sorted( range( len( intervals ) ), key=lambda idx: intervals[ idx ] )
+	results = [ None ] * len( intervals )
+
+	active = []   # heap of (end, column)
+	free = []     # heap of columns released in the current cluster
+	cluster = []
+	columnCount = 0
+
+	for idx in order:
+		start, end = intervals[ idx ]
+
+		while active and active[0][0] <= start:
+			heapq.heappush( free, heapq.heappop( active )[1] )
+
+		if not active:
+			for member in cluster:
+				results[ member ] = ( results[ member ], columnCount )
+			cluster = []
+			free = []
+			columnCount = 0
+
+		if free:
+			column = heapq.heappop( free )
+		else:
+			column = columnCount
+			columnCount += 1
+
+		heapq.heappush( active, ( end, column ) )
+		results[ idx ] = column
+		cluster.append( idx )
+
+	for member in cluster:
+		results[ member ] = ( results[ member ], columnCount )
+
+	return results
+
+
+def packRows( intervals ):
+	"""
+	Distributes a list of (start, end) intervals on as few rows as
+	possible, no two intervals of a row overlapping. Each interval,
+	in start order, goes to the row which became free the earliest,
+	or to a new row if none is free; this is optimal and the number
+	of rows is the maximum number of intervals overlapping at once.
+
+	Returns a list of rows, each one a list of indexes in the input
+	list, sorted by start.
+	"""
+
+	order = sorted( range( len( intervals ) ), key=lambda idx: intervals[ idx ] )
+	rows = []
+	ends = []     # heap of (end, row)
+
+	for idx in order:
+		start, end = intervals[ idx ]
+
+		if ends and ends[0][0] <= start:
+			row = ends[0][1]
+			heapq.heapreplace( ends, ( end, row ) )
+		else:
+			row = len( rows )
+			rows.append( [] )
+			heapq.heappush( ends, ( end, row ) )
+
+		rows[ row ].append( idx )
+
+	return rows
+
+
+def packChains( intervals ):
+	"""
+	Historical row  layout  (wxSCHEDULER_PACKING_CHAINED): each row
+	starts with the first remaining interval and chains the nearest
+	interval starting after the previous one ends. This is quadratic
+	and usually needs more rows than packRows.
+
+	Returns a list of rows, each one a list of indexes in the input
+	list.
+	"""
+
+	remaining = list( range( len( intervals ) ) )
+	rows = []
+
+	while remaining:
+		row = []
+		idx = remaining[0]
+
+		while idx is not None:
+			row.append( idx )
+			remaining.remove( idx )
+
+			end = intervals[ idx ][1]
+			idx = None
+			minDelta = None
+			for other in remaining:
+				delta = intervals[ other ][0] - end
+				if delta >= 0 and ( minDelta is None or minDelta > delta ):
+					minDelta = delta
+					idx = other
+
+		rows.append( row )
+
+	return rows
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from wxTimeAxis import wxTimeAxis
+import datetime
 import wx
 
 
@@ -56,6 +58,52 @@ def copyDateTime(value):
 	else:
 		return wx.DateTime()
 
+def dateTimeToSeconds(value):
+	""" Return the number of seconds elapsed since 0001-01-01 00:00:00
+	(milliseconds are ignored). Used as an integer key to sort and
+	compare dates without calling into wx.
+	"""
+	days = dateToOrdinal(value)
+	return ((days * 24 + value.GetHour()) * 60 + value.GetMinute()) * 60 + value.GetSecond()
+
+def dateToOrdinal(value):
+	""" Return the proleptic Gregorian ordinal of the date (Y,M,D).
+	"""
+	return datetime.date(value.GetYear(), value.GetMonth() + 1, value.GetDay()).toordinal()
+
+def ordinalToDate(ordinal):
+	""" Return a wx.DateTime at midnight of the day whose proleptic
+	Gregorian ordinal is given.
+	"""
+	value = datetime.date.fromordinal(ordinal)
+	return wx.DateTimeFromDMY(value.day, value.month - 1, value.year)
+
+def secondsToDateTime(value):
+	""" Inverse of dateTimeToSeconds.
+	"""
+	days, seconds = divmod(value, 86400)
+	result = ordinalToDate(days)
+	result.SetHour(seconds // 3600)
+	result.SetMinute(seconds // 60 % 60)
+	result.SetSecond(seconds % 60)
+	return result
+
+def makeTimeAxis(firstDay, dayCount, workingHours):
+	""" Build a wxTimeAxis starting on firstDay from working hours
+	given as a list of (start, end) wx.DateTime pairs (only hours and
+	minutes are used), or a dict mapping week days to such lists.
+	"""
+	def minutes(intervals):
+		return [(start.GetHour() * 60 + start.GetMinute(), end.GetHour() * 60 + end.GetMinute())
+			for start, end in intervals]
+
+	if isinstance(workingHours, dict):
+		hours = dict([(weekDay, minutes(intervals)) for weekDay, intervals in workingHours.items()])
+	else:
+		hours = minutes(workingHours)
+
+	return wxTimeAxis(dateToOrdinal(firstDay), dayCount, hours)
+
 def setToWeekDayInSameWeek(day, offset, startDay=1):
 	"""wxDateTime's    SetToWeekDayInSameWeek   appears    to   be
 	buggish. When told that the  week starts on Monday, it results
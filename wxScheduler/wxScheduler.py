@@ -2,8 +2,8 @@
 # -*- coding: utf-8 -*-
 
 from wxSchedulerCore import *
+from wxSchedulerTicker import wxMinuteTicker
 import wx.lib.scrolledpanel as scrolled
-import time
 
 
 class wxScheduler( wxSchedulerCore, scrolled.ScrolledPanel ):
@@ -19,10 +19,10 @@ class wxScheduler( wxSchedulerCore, scrolled.ScrolledPanel ):
 		self._frozen = False
 		self._dirty = False
 		self._refreshing = False
+		self._resizeBitmap = None
 
 		self._showNow = True
-		self._refreshTimer = wx.Timer(self, wx.NewId() )
-		self._refreshTimer.Start( int(1000 * (60 - (time.time() % 60))), True )
+		wxMinuteTicker.Subscribe( self )
 
 		self.Bind( wx.EVT_PAINT, self.OnPaint )
 		self.Bind( wx.EVT_LEFT_DOWN, self.OnClick )
@@ -31,8 +31,11 @@ class wxScheduler( wxSchedulerCore, scrolled.ScrolledPanel ):
 		self.Bind( wx.EVT_MOTION, self.OnMotion )
 		self.Bind( wx.EVT_LEFT_DCLICK, self.OnDClick )
 		self.Bind( wx.EVT_SIZE, self.OnSize )
+		self.Bind( wx.EVT_IDLE, self.OnIdle )
 		self.Bind( wx.EVT_TIMER, self.OnSizeTimer, id=timerId )
-		self.Bind( wx.EVT_TIMER, self.OnRefreshTimer, id=self._refreshTimer.GetId() )
+		self.Bind( wx.EVT_SYS_COLOUR_CHANGED, self.OnDisplayChanged )
+		if hasattr( wx, "EVT_DPI_CHANGED" ):
+			self.Bind( wx.EVT_DPI_CHANGED, self.OnDisplayChanged )
 
 		self.SetScrollRate(10, 10)
 
@@ -54,45 +57,150 @@ class wxScheduler( wxSchedulerCore, scrolled.ScrolledPanel ):
 
 	def OnSize( self, evt ):
 		if not self._refreshing:
+			# Until the size settles, paint events stretch what was
+			# last drawn instead of laying the view out again.
+			if not self._sizeTimer.IsRunning() and self._resizable and self._isShown():
+				self._resizeBitmap = self._snapshotView()
 			self._sizeTimer.Start(250, True)
 		evt.Skip()
 
 	def OnSizeTimer( self, evt ):
-		self._refreshing = True
-		try:
-			self.InvalidateMinSize()
-			self.Refresh()
-			try:
-				wx.Yield()
-			except:
-				pass
-		finally:
-			self._refreshing = False
+		self._resizeBitmap = None
+		self.InvalidateMinSize()
+		self.Refresh()
 
-	def OnRefreshTimer( self, evt ):
+	def OnDisplayChanged( self, evt ):
+		"""
+		The resolution or the system theme (colours and fonts)
+		changed: cached system colours, text extents, fitted font
+		sizes, and the layouts and tiles computed with them, are
+		obsolete.
+		"""
+		InvalidateSystemColours()
+		self._drawerClass.textMetrics.Clear()
+		self._drawerClass.fonts.Clear()
+		self._layoutCache.Clear()
+		self._gridKey = None
+		self.InvalidateMinSize()
 		self.Refresh()
-		self._refreshTimer.Start( 60000, True )
+		evt.Skip()
+
+	def OnIdle( self, evt ):
+		if self._frozen:
+			return
+
+		if self._dirty:
+			# Rendered when shown
+			if self._isShown():
+				self._render()
+		elif self._prefetchTile():
+			# Prefetch the tiles the view is scrolled towards
+			evt.RequestMore()
+
+	def OnMinute( self ):
+		"""
+		Called by wxMinuteTicker on each minute boundary while the
+		'now' line is shown.
+		"""
+		if self._frozen or self._dirty or not self._isShown():
+			self._dirty = True
+		else:
+			self._moveNowLine()
 
 	def Add( self, *args, **kwds ):
 		wxSchedulerCore.Add( self, *args, **kwds )
 		self._controlBindSchedules()
 		
+	def _isShown( self ):
+		"""
+		Returns True if the scheduler is shown on screen, with a
+		non-empty area. A dirty scheduler is only rendered then.
+		"""
+		width, height = self.GetClientSizeTuple()
+		return width > 0 and height > 0 and self.IsShownOnScreen()
+
 	def Refresh(self):
-		if self._frozen:
-			self._dirty = True
+		"""
+		Marks the view dirty. It is laid out and drawn once, on the
+		next idle or paint event, however many changes were made in
+		between; call Update() to render it right away.
+		"""
+		self._dirty = True
+		wx.WakeUpIdle()
+
+	def Update(self):
+		"""
+		Renders the view now if it is dirty, and repaints the window.
+		"""
+		if self._dirty and not self._frozen:
+			self._render()
+		super(wxScheduler, self).Update()
+
+	def _render(self, invalidate=True):
+		"""
+		Lays the view out. If 'invalidate' is True, the virtual size
+		is fitted and the window repainted; when rendering from a
+		paint event, which paints the new layout itself, fitting the
+		virtual size waits until the paint event is over.
+		"""
+		self._dirty = False
+		self._resizeBitmap = None
+		self.DrawBuffer()
+
+		if invalidate:
+			self._fitInside()
+			scrolled.ScrolledPanel.Refresh(self)
 		else:
-			self.DrawBuffer()
+			wx.CallAfter(self._fitInside)
+
+		if self._headerPanel is not None:
+			self._headerPanel.Refresh()
+
+	def _fitInside(self):
+		# Called later from OnPaint; the window may be gone
+		if not self:
+			return
+
+		# Scroll bars coming and going are not a resize gesture
+		self._refreshing = True
+		try:
 			self.GetSizer().FitInside(self)
-			super(wxScheduler, self).Refresh()
-			self._dirty = False
+		finally:
+			self._refreshing = False
+
+	def OnPaint( self, evt = None ):
+		if self._resizeBitmap is not None:
+			self._paintResizeBitmap()
+			return
+
+		if self._dirty and not self._frozen and self._isShown():
+			self._render(invalidate=False)
+		super(wxScheduler, self).OnPaint(evt)
+
+	def _paintResizeBitmap( self ):
+		"""
+		Paints the view as it was when the resize began, stretched to
+		the client area.
+		"""
+		dc = wx.PaintDC(self)
+		width, height = self.GetClientSizeTuple()
+		bitmapWidth, bitmapHeight = self._resizeBitmap.GetWidth(), self._resizeBitmap.GetHeight()
+
+		dc.SetUserScale(float(width) / bitmapWidth, float(height) / bitmapHeight)
+		dc.DrawBitmap(self._resizeBitmap, 0, 0, False)
 
 	def Freeze(self):
+		"""
+		Not needed for performance any more, since refreshing is
+		deferred; Thaw() renders the view on the next idle event if
+		it changed in between.
+		"""
 		self._frozen = True
 
 	def Thaw(self):
 		self._frozen = False
 		if self._dirty:
-			self.Refresh()
+			wx.WakeUpIdle()
 
 	def SetResizable( self, value ):
 		"""
@@ -103,11 +211,17 @@ class wxScheduler( wxSchedulerCore, scrolled.ScrolledPanel ):
 		self.Refresh()
 
 	def OnScheduleChanged( self, event ):
-		if self._frozen:
+		if event.layoutNeeded:
+			previous = self._index.GetInterval( event.schedule )
+			self._indexSchedule( event.schedule )
+
+		if self._frozen or self._dirty or not self._isShown():
 			self._dirty = True
 		else:
 			if event.layoutNeeded:
-				self.Refresh()
+				# Only the day columns it leaves or enters, if possible
+				if not self._relayoutSchedule( event.schedule, previous ):
+					self.Refresh()
 			else:
 				self.RefreshSchedule(event.schedule)
 
@@ -147,12 +261,6 @@ class wxScheduler( wxSchedulerCore, scrolled.ScrolledPanel ):
 
 	def SetShowNow( self, show=True ):
 		self._showNow = show
-
-		if show:
-			self._refreshTimer.Start( int(1000 * (60 - (time.time() % 60))), True )
-		else:
-			self._refreshTimer.Stop()
-
 		self.Refresh()
 
 	def GetShowNow( self ):
@@ -17,15 +17,29 @@ wxSCHEDULER_PREVIEW	 = 8
 wxSCHEDULER_WEEKSTART_MONDAY = 1
 wxSCHEDULER_WEEKSTART_SUNDAY = 0
 
-# Not actually a constant :)
+# Not actually a constant :) System colours are cached until
+# InvalidateSystemColours() is called, which wxScheduler does on
+# EVT_SYS_COLOUR_CHANGED.
+_systemColours = {}
+
+def InvalidateSystemColours():
+    _systemColours.clear()
+
+def SYSTEM_COLOUR( index ):
+    _colour = _systemColours.get( index, None )
+    if _colour is None:
+        _colour = _systemColours[ index ] = wx.SystemSettings.GetColour( index )
+    return _colour
+
 def SCHEDULER_BACKGROUND_BRUSH():
-    _bg = wx.SystemSettings.GetColour( wx.SYS_COLOUR_WINDOW )
-    _r, _g, _b = _bg.Red(), _bg.Green(), _bg.Blue()
-    return wx.Colour( max(0, _r - 15), max(0, _g - 15), max(0, _b - 15) )  
+    _colour = _systemColours.get( 'background', None )
+    if _colour is None:
+        _bg = SYSTEM_COLOUR( wx.SYS_COLOUR_WINDOW )
+        _r, _g, _b = _bg.Red(), _bg.Green(), _bg.Blue()
+        _colour = _systemColours[ 'background' ] = wx.Colour( max(0, _r - 15), max(0, _g - 15), max(0, _b - 15) )
+    return _colour
 def DAY_BACKGROUND_BRUSH():
-    _bg = wx.SystemSettings.GetColour( wx.SYS_COLOUR_WINDOW )
-    _r, _g, _b = _bg.Red(), _bg.Green(), _bg.Blue()
-    return wx.Colour( _r, _g, _b )
+    return SYSTEM_COLOUR( wx.SYS_COLOUR_WINDOW )
 FOREGROUND_PEN				= wx.LIGHT_GREY_PEN
 
 LEFT_COLUMN_SIZE		= 50
@@ -37,5 +51,25 @@ SCHEDULE_INSIDE_MARGIN	= 5
 SCHEDULE_OUTSIDE_MARGIN = 2
 SCHEDULE_MAX_HEIGHT     = 80
 
+# Scrolled views are drawn in tiles of TILE_SIZE pixels squares,
+# which may take TILE_CACHE_BUDGET bytes
+TILE_SIZE			= 256
+TILE_CACHE_BUDGET		= 32 * 1024 * 1024
+
+# Number of text extents the drawers keep (see wxTextMetrics)
+TEXT_METRICS_CACHE_SIZE		= 4096
+
+# Number of derived fonts and fitted font sizes the drawers keep (see
+# wxFontManager)
+FONT_CACHE_SIZE			= 256
+
+# Number of pens and brushes of each kind the drawers keep (see
+# wxResourcePool)
+RESOURCE_CACHE_SIZE		= 256
+
 wxSCHEDULER_HORIZONTAL = 1
 wxSCHEDULER_VERTICAL   = 2
+
+# Row packing in horizontal style
+wxSCHEDULER_PACKING_MINIMAL = 1
+wxSCHEDULER_PACKING_CHAINED = 2
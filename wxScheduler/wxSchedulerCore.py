@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from wxSchedule import *
+from wxScheduleIndex import wxScheduleIndex
 from wxSchedulerConstants import *
 from wxSchedulerPaint import *
 import wx
@@ -33,6 +34,8 @@ class wxSchedulerCore( wxSchedulerPaint ):
 		
 		self._schedules = []
 		self._schBind = []
+		self._index = wxScheduleIndex()
+		self._revision = 0
 		self._periodCount = 1
 		
 		#Internal (extenal?) init values
@@ -107,6 +110,22 @@ class wxSchedulerCore( wxSchedulerPaint ):
 			self._currentDate.AddDS( offset )
 		elif side == wxSCHEDULER_PREV:
 			self._currentDate.SubtractDS( offset )
+
+	def _indexSchedule( self, schedule ):
+		"""
+		Store (or refresh) the schedule's extent in the interval index
+		"""
+		self._index.Add( schedule, utils.dateTimeToSeconds( schedule.start ),
+				 utils.dateTimeToSeconds( schedule.end ) )
+		self._schedulesChanged()
+
+	def _schedulesChanged( self ):
+		"""
+		The schedule set or the layout of a schedule changed: cached
+		layouts are obsolete.
+		"""
+		self._revision += 1
+		self._layoutCache.Clear()
 			
 	#-----------------------
 	#  External methods
@@ -118,6 +137,7 @@ class wxSchedulerCore( wxSchedulerPaint ):
 		# current visualization
 		if isinstance( schedules, wxSchedule ):
 			self._schedules.append( schedules )
+			self._indexSchedule( schedules )
 			
 		elif isinstance( schedules, ( list, tuple ) ):
 			#Control the schedule(s) passed
@@ -125,7 +145,11 @@ class wxSchedulerCore( wxSchedulerPaint ):
 				if not isinstance( sc, wxSchedule ):
 					raise InvalidSchedule, "Not a valid schedule"
 				
-				self._schedules.append( sc )
+			self._schedules.extend( schedules )
+			# Indexed at once: the index is sorted once, on the next query
+			self._index.Load( [ ( sc, utils.dateTimeToSeconds( sc.start ), utils.dateTimeToSeconds( sc.end ) )
+					    for sc in schedules ] )
+			self._schedulesChanged()
 				
 		else:
 			raise ValueError( "Invalid value passed" )
@@ -144,6 +168,9 @@ class wxSchedulerCore( wxSchedulerPaint ):
 			schedule = index
 		else:
 			raise ValueError, "Passme only int or wxSchedule istances"
+
+		self._index.Remove( schedule )
+		self._schedulesChanged()
 		
 		#Remove from our bind list and unbind the event
 		self._schBind.remove( schedule )
@@ -184,6 +211,15 @@ class wxSchedulerCore( wxSchedulerPaint ):
 		# in rendering mode
 		return self._schedules
 
+	def GetSchedulesInRange( self, start, end ):
+		"""
+		Return the schedules overlapping the period between start and
+		end (both wx.DateTime), sorted by start date. This uses the
+		interval index, so only the matching schedules are visited.
+		"""
+		return self._index.Query( utils.dateTimeToSeconds( start ),
+					  utils.dateTimeToSeconds( end ) )
+
 	def GetShowWorkHour( self ):
 		#Return show work hour
 		return self._showOnlyWorkHour
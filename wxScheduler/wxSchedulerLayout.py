@@ -0,0 +1,788 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from wxSchedulePacker import packChains, packColumns, packRows
+from wxSlotGrid import wxSlotGrid
+from wxTimeAxis import wxTimeAxis
+import calendar
+import datetime
+
+
+# Same values as in wxSchedulerConstants, which depends on wx
+_DAILY, _WEEKLY, _MONTHLY = 1, 2, 3
+_HORIZONTAL, _VERTICAL = 1, 2
+_PACKING_CHAINED = 2
+
+# Header kinds
+HEADER_DAY = 'day'
+HEADER_MONTH = 'month'
+HEADER_SIMPLE_DAY = 'simpleday'
+
+
+def weekDay( day ):
+	"""
+	Returns the week day of a day ordinal, 0 being Sunday as in
+	wx.DateTime.GetWeekDay.
+	"""
+	return ( datetime.date.fromordinal( day ).weekday() + 1 ) % 7
+
+
+class wxLayoutState(object):
+	"""
+	Everything the layout of a view depends on, besides schedules
+	and text measurements. Days are proleptic Gregorian ordinals,
+	times of day are minutes since midnight and sizes are pixels.
+	Unknown keyword arguments raise a TypeError.
+	"""
+
+	def __init__( self, **kwargs ):
+		self.viewType = _DAILY
+		self.style = _VERTICAL
+		self.day = datetime.date.today().toordinal()
+		self.today = self.day
+		self.periodCount = 1
+		self.weekStart = 1
+		self.workingHours = [ ( 480, 1200 ) ]
+		self.displayedSlots = list( range( 480, 1200, 30 ) )
+		self.width = 0
+		self.height = 0
+		self.periodWidth = 150
+		self.drawHeaders = True
+		self.scrolled = False
+		self.clientWidth = 0
+		self.pageNumber = None
+		self.pageHeight = 0
+		self.schedulePages = {}
+		self.rowPacking = 1
+
+		self.leftColumnSize = 50
+		self.daySizeMin = ( 400, 400 )
+		self.weekSizeMin = ( 980, 400 )
+		self.monthCellSizeMin = ( 100, 100 )
+		self.scheduleMargin = 2
+
+		for name, value in kwargs.items():
+			if not hasattr( self, name ):
+				raise TypeError( 'Unknown layout parameter: %s' % name )
+			setattr( self, name, value )
+
+	def Key( self ):
+		"""
+		Returns a hashable value identifying the state. Schedule
+		pages are left out; they only matter when printing.
+		"""
+		names = sorted( self.__dict__.keys() )
+		return tuple( [ ( name, _freeze( self.__dict__[ name ] ) )
+				for name in names if name != 'schedulePages' ] )
+
+
+def _freeze( value ):
+	if isinstance( value, dict ):
+		return tuple( sorted( [ ( key, _freeze( item ) ) for key, item in value.items() ] ) )
+	if isinstance( value, ( list, tuple ) ):
+		return tuple( [ _freeze( item ) for item in value ] )
+	return value
+
+
+class wxLayoutMetrics(object):
+	"""
+	Text measurements needed by the layout. The scheduler uses a
+	wxDrawerMetrics, which asks the drawer; this class returns fixed
+	values and is enough to lay views out without wx.
+	"""
+
+	def DayHeaderHeight( self, day ):
+		return 24
+
+	def MonthHeaderHeight( self, day ):
+		return 24
+
+	def SimpleDayHeaderHeight( self, day ):
+		return 24
+
+	def HoursHeight( self, width, includeText=True ):
+		"""
+		Height of the hours ruler in horizontal style.
+		"""
+		if includeText:
+			return 21
+		return 0
+
+	def ScheduleHeight( self, schedule, width ):
+		"""
+		Height of a schedule drawn horizontally in 'width' pixels,
+		margins excluded.
+		"""
+		return 25
+
+
+class wxLayoutSegment(object):
+	"""
+	The part of a schedule shown in a period, in seconds (see
+	wxScheduleUtils.dateTimeToSeconds). clipStart and clipEnd tell
+	whether the schedule actually extends beyond the period. The
+	rectangle includes the outside margin; it is None for schedules
+	of compact month cells, which the drawer places.
+	"""
+
+	__slots__ = ( 'schedule', 'start', 'end', 'clipStart', 'clipEnd',
+		      'period', 'x', 'y', 'w', 'h' )
+
+	def __init__( self, schedule, start, end, clipStart, clipEnd, period=None ):
+		self.schedule = schedule
+		self.start = start
+		self.end = end
+		self.clipStart = clipStart
+		self.clipEnd = clipEnd
+		self.period = period
+		self.x = self.y = self.w = self.h = None
+
+	def GetRect( self ):
+		return self.x, self.y, self.w, self.h
+
+
+class wxLayoutPeriod(object):
+	"""
+	A run of days sharing a time axis: one day column in vertical
+	daily and weekly views, the whole view in horizontal style.
+	"""
+
+	__slots__ = ( 'firstDay', 'dayCount', 'axis', 'x', 'y', 'w', 'h' )
+
+	def __init__( self, firstDay, dayCount, axis, x, y, w, h ):
+		self.firstDay = firstDay
+		self.dayCount = dayCount
+		self.axis = axis
+		self.x = x
+		self.y = y
+		self.w = w
+		self.h = h
+
+
+class wxLayout(object):
+	"""
+	Geometry of a view, as computed by computeLayout. Drawing it
+	(see wxSchedulerPaint.DoPaint) goes through the lists below in
+	order:
+
+	headers	 -- (kind, day, x, y, w, h, highlight); kind is one of
+		    HEADER_DAY, HEADER_MONTH or HEADER_SIMPLE_DAY
+	hours	 -- (x, y, w, h, includeText) hours rulers
+	days	 -- (day, x, y, w, h, highlight) day backgrounds
+	segments -- wxLayoutSegment, with their rectangles
+	cells	 -- (day, x, y, w, h, segments) compact month cells;
+		    day is None for cells outside the month
+
+	plus:
+
+	periods		-- wxLayoutPeriod, where to draw the 'now' line
+	slotGrid	-- wxSlotGrid of the clickable time slots, or None
+	headerBounds	-- (x, y, h) resizable header edges
+	pageCount, pageLimits, schedulePages -- pagination, when the
+			   state has no page number; schedulePages maps
+			   id(schedule) to its page
+	width, height	-- the minimum size of the view
+	state, x, y	-- what computeLayout was given
+
+	The drawer places the schedules of compact month cells: where
+	they went is given to PlaceCell when a cell is first drawn, and
+	kept with the layout, which may be recorded again without
+	drawing its cells (see wxSchedulerPaint._recordLayout).
+	"""
+
+	def __init__( self ):
+		self.headers = []
+		self.hours = []
+		self.days = []
+		self.segments = []
+		self.cells = []
+
+		self.periods = []
+		self.slotGrid = None
+		self.headerBounds = []
+
+		self.pageCount = None
+		self.pageLimits = None
+		self.schedulePages = {}
+
+		self.width = 0
+		self.height = 0
+
+		self.state = None
+		self.x = self.y = 0
+
+		self._placedCells = {}
+
+	def PlaceCell( self, index, rects ):
+		"""
+		Remembers the (item, x1, y1, x2, y2) rectangles of the
+		schedules drawn in cell 'index'. Returns False, keeping the
+		first ones, if the cell was already placed.
+		"""
+		if index in self._placedCells:
+			return False
+
+		self._placedCells[ index ] = list( rects )
+		return True
+
+	def GetPlacedCells( self ):
+		"""
+		Returns the rectangles given to PlaceCell, cell by cell.
+		"""
+		return [ rect for index in sorted( self._placedCells ) for rect in self._placedCells[ index ] ]
+
+	def IsIncremental( self ):
+		"""
+		Returns True if the periods of this layout can be laid out
+		again one by one (see relayoutPeriods): day columns in
+		vertical daily and weekly views.
+		"""
+		return self.state is not None and self.state.style == _VERTICAL and \
+		       self.state.viewType != _MONTHLY
+
+	def GetPeriodsInRange( self, start, end ):
+		"""
+		Returns the indexes of the periods a schedule going from
+		'start' to 'end' (seconds) is shown in.
+		"""
+		return [ index for index, period in enumerate( self.periods )
+			 if start < ( period.firstDay + period.dayCount ) * 86400 and end >= period.firstDay * 86400 ]
+
+
+class wxLayoutCache(object):
+	"""
+	Keeps the 'maxSize' most recently used layouts, so that going
+	back to a view, repainting after scrolling or when the 'now'
+	line moves does not lay it out again.
+	"""
+
+	def __init__( self, maxSize=16 ):
+		self.maxSize = maxSize
+		self._layouts = {}
+		self._keys = []   # Least recently used first
+
+	def __len__( self ):
+		return len( self._keys )
+
+	def Get( self, key ):
+		"""
+		Returns the layout stored for 'key', or None.
+		"""
+		layout = self._layouts.get( key, None )
+		if layout is not None and self._keys[-1] != key:
+			self._keys.remove( key )
+			self._keys.append( key )
+		return layout
+
+	def Put( self, key, layout ):
+		if key in self._layouts:
+			self._keys.remove( key )
+		self._layouts[ key ] = layout
+		self._keys.append( key )
+
+		while len( self._keys ) > self.maxSize:
+			del self._layouts[ self._keys.pop( 0 ) ]
+
+	def Clear( self ):
+		self._layouts = {}
+		self._keys = []
+
+
+def computeLayout( state, source, metrics, x=0, y=0 ):
+	"""
+	Lays out the view described by 'state' (a wxLayoutState) in the
+	rectangle at (x, y) of state.width by state.height pixels, and
+	returns a wxLayout.
+
+	source(start, end) must return (schedule, start, end) tuples for,
+	at least, every schedule overlapping [start, end]; times are in
+	seconds. 'metrics' measures text, see wxLayoutMetrics.
+	"""
+	layout = wxLayout()
+	layout.state, layout.x, layout.y = state, x, y
+	engine = _LayoutEngine( state, source, metrics, layout )
+
+	if state.viewType == _DAILY:
+		size = engine.daily( state.day, x, y, state.width, state.height )
+	elif state.viewType == _WEEKLY:
+		size = engine.weekly( state.day, x, y, state.width, state.height )
+	else:
+		size = engine.monthly( state.day, x, y, state.width, state.height )
+
+	layout.width, layout.height = size
+	return layout
+
+
+def computeHeaderLayout( state, metrics, x, width, height ):
+	"""
+	Lays out the headers alone, as drawn in a header panel (see
+	wxSchedulerPaint.SetHeaderPanel). The layout's height is the
+	height the panel needs.
+	"""
+	layout = wxLayout()
+	engine = _LayoutEngine( state, None, metrics, layout )
+
+	if state.viewType == _MONTHLY:
+		_, h = engine.monthlyHeaders( state.day, x, 0, width, height )
+	else:
+		if state.style == _VERTICAL:
+			x += state.leftColumnSize
+			width -= state.leftColumnSize
+
+		periodWidth = 1.0 * width / state.periodCount
+
+		h = 0
+		for idx in range( state.periodCount ):
+			if state.viewType == _DAILY:
+				_, dh = engine.dailyHeaders( state.day + idx, x + periodWidth * idx, 0, periodWidth, height )
+			else:
+				dh = engine.weeklyHeaders( engine.firstWeekDay( state.day ) + 7 * idx,
+							   x + periodWidth * idx, 0, periodWidth, height )
+			h = max( h, dh )
+
+	# Mmmmh, maybe we'll support this later, but not right now
+	if state.style == _VERTICAL:
+		layout.headerBounds = []
+
+	layout.width, layout.height = width, h
+	return layout
+
+
+def relayoutPeriods( layout, source, metrics, periods ):
+	"""
+	Lays out again, in place, the schedules of some periods (indexes
+	in layout.periods) after schedules changed. The layout must be
+	incremental (see wxLayout.IsIncremental); its size, slot grid and
+	headers do not depend on schedules then.
+	"""
+	periods = set( periods )
+	engine = _LayoutEngine( layout.state, source, metrics, layout )
+
+	layout.segments = [ segment for segment in layout.segments if segment.period not in periods ]
+	for index in periods:
+		engine.place( index )
+
+	layout.segments.sort( key=lambda segment: segment.period )
+
+
+class _LayoutEngine(object):
+	"""
+	Does the actual work for computeLayout; methods mirror the
+	structure of the views.
+	"""
+
+	def __init__( self, state, source, metrics, layout ):
+		self.state = state
+		self.source = source
+		self.metrics = metrics
+		self.layout = layout
+		self.vertical = state.style == _VERTICAL
+
+		self._buckets = None
+		self._bucketDays = ( 0, 0 )
+
+	def firstWeekDay( self, day ):
+		return day - ( weekDay( day ) - self.state.weekStart ) % 7
+
+	def hours( self, x, y, width, height, includeText=True ):
+		"""
+		Adds an hours ruler; returns its size.
+		"""
+		self.layout.hours.append( ( x, y, width, height, includeText ) )
+
+		if self.vertical:
+			return self.state.leftColumnSize, max( height, self.state.daySizeMin[1] )
+		return max( width, self.state.daySizeMin[0] ), self.metrics.HoursHeight( width, includeText )
+
+	def bucket( self, firstDay, dayCount ):
+		"""
+		Queries the schedules of these days at once and splits them
+		in per-day buckets of clipped (schedule, start, end, clipStart,
+		clipEnd) tuples, which segments() then reads for single days.
+		A schedule is in every day from the one it starts to the one
+		it ends, that one included even if it ends at midnight.
+		"""
+		start = firstDay * 86400
+		end = ( firstDay + dayCount ) * 86400
+		lastDay = firstDay + dayCount - 1
+
+		buckets = {}
+		for schedule, scheduleStart, scheduleEnd in self.source( start, end ):
+			if scheduleStart >= end or scheduleEnd < start:
+				continue
+
+			for day in range( max( firstDay, scheduleStart // 86400 ), min( lastDay, scheduleEnd // 86400 ) + 1 ):
+				dayStart = day * 86400
+				dayEnd = dayStart + 86400
+				buckets.setdefault( day, [] ).append( ( schedule, max( dayStart, scheduleStart ), min( dayEnd, scheduleEnd ),
+									scheduleStart < dayStart, scheduleEnd > dayEnd ) )
+
+		for items in buckets.values():
+			items.sort( key=lambda item: item[1] )
+
+		self._buckets = buckets
+		self._bucketDays = ( firstDay, firstDay + dayCount )
+
+	def segments( self, firstDay, dayCount, period=None ):
+		"""
+		Returns the wxLayoutSegment of schedules overlapping the
+		days, sorted by start.
+		"""
+		if dayCount == 1 and self._buckets is not None and \
+		       self._bucketDays[0] <= firstDay < self._bucketDays[1]:
+			return [ wxLayoutSegment( schedule, start, end, clipStart, clipEnd, period )
+				 for schedule, start, end, clipStart, clipEnd in self._buckets.get( firstDay, [] ) ]
+
+		start = firstDay * 86400
+		end = ( firstDay + dayCount ) * 86400
+
+		results = []
+		for schedule, scheduleStart, scheduleEnd in self.source( start, end ):
+			if scheduleStart >= end or scheduleEnd < start:
+				continue
+			results.append( wxLayoutSegment( schedule, max( start, scheduleStart ), min( end, scheduleEnd ),
+							 scheduleStart < start, scheduleEnd > end, period ) )
+
+		results.sort( key=lambda segment: segment.start )
+		return results
+
+	def period( self, firstDay, dayCount, x, y, width, height, highlight=False ):
+		state = self.state
+		layout = self.layout
+
+		axis = wxTimeAxis( firstDay, dayCount, state.workingHours )
+		period = len( layout.periods )
+		layout.periods.append( wxLayoutPeriod( firstDay, dayCount, axis, x, y, width, height ) )
+
+		for dayN in range( dayCount ):
+			day = firstDay + dayN
+			color = highlight
+			if day == state.today and ( state.viewType != _DAILY or dayCount >= 2 ):
+				color = True
+			layout.days.append( ( day, x + 1.0 * width / dayCount * dayN, y, 1.0 * width / dayCount, height, color ) )
+
+		offsetY = self.place( period )
+
+		if not self.vertical:
+			columns = len( state.displayedSlots ) * dayCount
+			if columns:
+				layout.slotGrid = wxSlotGrid( x, y, 1.0 * width / columns, height, columns, 1,
+							      firstDay, state.displayedSlots, vertical=False )
+
+		if self.vertical:
+			return max( width, state.daySizeMin[0] ), max( height, state.daySizeMin[1] )
+		else:
+			return max( width, state.periodWidth ), offsetY
+
+	def place( self, index ):
+		"""
+		Lays out the schedules of a period (an index in
+		layout.periods), appending to layout.segments. Returns the
+		height of the rows in horizontal style.
+		"""
+		state = self.state
+		layout = self.layout
+		margin = state.scheduleMargin
+
+		period = layout.periods[ index ]
+		x, y, width, height = period.x, period.y, period.w, period.h
+
+		segments = self.segments( period.firstDay, period.dayCount, index )
+		intervals = [ ( segment.start, segment.end ) for segment in segments ]
+
+		# Position and size of all schedules at once (vectorized if NumPy is there and they are many)
+		geometry = period.axis.ScheduleSizes( [ start // 60 for start, _ in intervals ],
+						      [ end // 60 for _, end in intervals ] )
+
+		# Lists of (segment, x, width, geometry)
+		if self.vertical:
+			blocks = [ [ ( segments[ idx ], x + 1.0 * width * column / columnCount, 1.0 * width / columnCount, geometry[ idx ] )
+				     for idx, ( column, columnCount ) in enumerate( packColumns( intervals ) ) ] ]
+		elif state.rowPacking == _PACKING_CHAINED:
+			blocks = [ [ ( segments[ idx ], x, width, geometry[ idx ] ) for idx in row ] for row in packChains( intervals ) ]
+		else:
+			blocks = [ [ ( segments[ idx ], x, width, geometry[ idx ] ) for idx in row ] for row in packRows( intervals ) ]
+
+		offsetY = 0
+
+		if not state.pageNumber:
+			layout.pageCount = 1
+			layout.pageLimits = [ 0 ]
+
+			pageHeight = state.pageHeight
+			currentPageHeight = y
+
+		if not segments or not period.axis.GetTotal():
+			return offsetY
+
+		for block in blocks:
+			maxDY = 0
+
+			for segment, segmentX, segmentWidth, ( size, position, total ) in block:
+				if state.pageNumber is not None:
+					if state.schedulePages.get( id( segment.schedule ), None ) != state.pageNumber:
+						continue
+
+				if self.vertical:
+					segment.x = segmentX
+					segment.y = y + position * height / total
+					segment.w = segmentWidth
+					segment.h = height * size / total
+				else:
+					# Height is variable
+					innerWidth = width * size / total - 2 * margin
+					segment.x = x + position * width / total
+					segment.y = y + offsetY - margin
+					segment.w = innerWidth + 2 * margin
+					segment.h = self.metrics.ScheduleHeight( segment.schedule, innerWidth ) + 2 * margin
+					maxDY = max( maxDY, segment.h )
+
+				if state.pageNumber is None:
+					if currentPageHeight + segment.h >= pageHeight:
+						pageNo = layout.pageCount + 1
+					else:
+						pageNo = layout.pageCount
+
+					layout.schedulePages[ id( segment.schedule ) ] = pageNo
+
+				layout.segments.append( segment )
+
+			offsetY += maxDY
+
+			if not state.pageNumber:
+				currentPageHeight += maxDY
+				if currentPageHeight >= pageHeight:
+					layout.pageLimits.append( currentPageHeight - maxDY )
+					currentPageHeight = maxDY
+					layout.pageCount += 1
+
+		return offsetY
+
+	def dayColumn( self, day, x, y, width, height ):
+		return self.period( day, 1, x, y, width, height,
+				    highlight=day == self.state.today and self.state.periodCount >= 2 )
+
+	def dayColumnSlots( self, firstDay, dayCount, x, y, width, height ):
+		# The slots of dayCount day columns of equal width
+		slots = self.state.displayedSlots
+		if slots:
+			self.layout.slotGrid = wxSlotGrid( x, y, 1.0 * width / dayCount, 1.0 * height / len( slots ),
+							   dayCount, len( slots ), firstDay, slots )
+
+	def dailyHeaders( self, day, x, y, width, height, includeText=True ):
+		state = self.state
+
+		if not self.vertical:
+			self.layout.headerBounds.append( ( x, y, height ) )
+
+		if includeText:
+			highlight = day == state.today and ( state.viewType != _DAILY or state.periodCount >= 2 )
+			self.layout.headers.append( ( HEADER_DAY, day, x, y, width, height, highlight ) )
+			w, h = width, self.metrics.DayHeaderHeight( day )
+		else:
+			w, h = width, 0
+
+		if not ( self.vertical or state.drawHeaders ):
+			_, hh = self.hours( x, y + h, width, height - h, includeText=includeText )
+			h += hh
+
+		return w, h
+
+	def daily( self, day, x, y, width, height ):
+		state = self.state
+		minWidth = minHeight = 0
+
+		if self.vertical:
+			x += state.leftColumnSize
+			width -= state.leftColumnSize
+
+		periodWidth = 1.0 * width / state.periodCount
+
+		if state.drawHeaders:
+			maxDY = 0
+			for idx in range( state.periodCount ):
+				_, h = self.dailyHeaders( day + idx, x + periodWidth * idx, y, periodWidth, height )
+				maxDY = max( maxDY, h )
+			minHeight += maxDY
+			y += maxDY
+			height -= maxDY
+		else:
+			for idx in range( state.periodCount ):
+				self.dailyHeaders( day + idx, x + periodWidth * idx, y, periodWidth, height, includeText=False )
+
+		if self.vertical:
+			x -= state.leftColumnSize
+			width += state.leftColumnSize
+
+		if self.vertical:
+			w, h = self.hours( x, y, width, height )
+		elif state.drawHeaders:
+			periodWidth = 1.0 * width / state.periodCount
+			maxDY = 0
+			for idx in range( state.periodCount ):
+				_, h = self.hours( x + periodWidth * idx, y, periodWidth, height )
+				maxDY = max( maxDY, h )
+			w, h = 0, maxDY
+		else:
+			w, h = 0, 0
+
+		if self.vertical:
+			minWidth += w
+			x += w
+			width -= w
+		else:
+			minHeight += h
+			y += h
+			height -= h
+
+		if self.vertical:
+			self.bucket( day, state.periodCount )
+
+			periodWidth = 1.0 * width / state.periodCount
+			w = 0
+			for idx in range( state.periodCount ):
+				dw, _ = self.dayColumn( day + idx, x + periodWidth * idx, y, periodWidth, height )
+				w += dw
+
+			self.dayColumnSlots( day, state.periodCount, x, y, width, height )
+		else:
+			# A single period, or pagination fails
+			w, h = self.period( day, state.periodCount, x, y, width, height )
+
+		return minWidth + w, minHeight + h
+
+	def weeklyHeaders( self, firstDay, x, y, width, height ):
+		maxDY = 0
+
+		for weekday in range( 7 ):
+			day = firstDay + weekday
+			self.layout.headers.append( ( HEADER_DAY, day, x + weekday * 1.0 * width / 7, y, 1.0 * width / 7, height,
+						      day == self.state.today ) )
+			self.layout.headerBounds.append( ( int( x + ( weekday + 1 ) * 1.0 * width / 7 ), y, height ) )
+			maxDY = max( maxDY, self.metrics.DayHeaderHeight( day ) )
+
+		return maxDY
+
+	def weekly( self, day, x, y, width, height ):
+		state = self.state
+		firstDay = self.firstWeekDay( day )
+
+		minWidth = minHeight = 0
+
+		if self.vertical:
+			x += state.leftColumnSize
+			width -= state.leftColumnSize
+
+		maxDY = 0
+
+		if state.drawHeaders:
+			periodWidth = 1.0 * width / state.periodCount
+			for idx in range( state.periodCount ):
+				maxDY = max( maxDY, self.weeklyHeaders( firstDay + 7 * idx, x + periodWidth * idx, y, periodWidth, height ) )
+
+		if self.vertical:
+			x -= state.leftColumnSize
+			width += state.leftColumnSize
+
+		minHeight += maxDY
+		y += maxDY
+		height -= maxDY
+
+		if self.vertical:
+			w, h = self.hours( x, y, width, height )
+
+			minWidth += w
+			x += w
+			width -= w
+
+			self.bucket( firstDay, 7 * state.periodCount )
+
+			dayWidth = 1.0 * width / 7 / state.periodCount
+			for idx in range( 7 * state.periodCount ):
+				self.dayColumn( firstDay + idx, x + idx * dayWidth, y, dayWidth, height )
+
+			self.dayColumnSlots( firstDay, 7 * state.periodCount, x, y, width, height )
+
+			return ( max( state.weekSizeMin[0] * state.periodCount + state.leftColumnSize, width ),
+				 max( state.weekSizeMin[1], height ) )
+		else:
+			w, h = self.period( firstDay, 7 * state.periodCount, x, y, width, height )
+
+			minWidth += w
+			minHeight += h
+
+			return max( state.periodWidth * state.periodCount + state.leftColumnSize, minWidth ), minHeight
+
+	def monthlyHeaders( self, day, x, y, width, height ):
+		state = self.state
+
+		if state.scrolled:
+			self.layout.headers.append( ( HEADER_MONTH, day, 0, 0, state.clientWidth, height, False ) )
+		else:
+			self.layout.headers.append( ( HEADER_MONTH, day, x, y, width, height, False ) )
+		w, h = width, self.metrics.MonthHeaderHeight( day )
+
+		if not self.vertical:
+			date = datetime.date.fromordinal( day )
+			firstDay = date.replace( day=1 ).toordinal()
+			dayCount = calendar.monthrange( date.year, date.month )[1]
+
+			maxDY = 0
+			for idx in range( dayCount ):
+				theDay = firstDay + idx
+				self.layout.headers.append( ( HEADER_SIMPLE_DAY, theDay, x + 1.0 * idx * width / dayCount,
+							      y + h, 1.0 * width / dayCount, height, theDay == state.today ) )
+				self.layout.headerBounds.append( ( x + 1.0 * ( idx + 1 ) * width / dayCount, y + h, height ) )
+				maxDY = max( maxDY, self.metrics.SimpleDayHeaderHeight( theDay ) )
+
+			h += maxDY
+
+		return w, h
+
+	def monthly( self, day, x, y, width, height ):
+		state = self.state
+
+		if state.drawHeaders:
+			w, h = self.monthlyHeaders( day, x, y, width, height )
+		else:
+			w, h = width, 0
+
+		y += h
+		height -= h
+
+		date = datetime.date.fromordinal( day )
+		firstDay = date.replace( day=1 ).toordinal()
+		dayCount = calendar.monthrange( date.year, date.month )[1]
+
+		if self.vertical:
+			month = calendar.monthcalendar( date.year, date.month )
+			cellW, cellH = 1.0 * width / 7, 1.0 * height / len( month )
+
+			self.bucket( firstDay, dayCount )
+
+			# Cells before the 1st belong to the previous month
+			self.layout.slotGrid = wxSlotGrid( x, y, cellW, cellH, 7, len( month ),
+							   firstDay - month[0].index( 1 ), [ 0 ], vertical=False,
+							   dayRange=( firstDay, firstDay + dayCount - 1 ) )
+
+			for row, monthWeek in enumerate( month ):
+				for column, monthDay in enumerate( monthWeek ):
+					cellX, cellY = x + column * cellW, y + row * cellH
+
+					if monthDay == 0:
+						theDay = None
+						segments = []
+					else:
+						theDay = date.replace( day=monthDay ).toordinal()
+						segments = self.segments( theDay, 1 )
+
+					self.layout.cells.append( ( theDay, cellX, cellY, cellW, cellH, segments ) )
+
+			return ( max( state.monthCellSizeMin[0] * 7, width ),
+				 max( state.monthCellSizeMin[1] * len( month ), height ) )
+		else:
+			minHeight = h
+
+			w, h = self.period( firstDay, dayCount, x, y, width, height )
+
+			return w, minHeight + h
@@ -1,10 +1,14 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from wxSchedule import wxSchedule
-from wxDrawer import wxBaseDrawer, wxFancyDrawer
+from wxSchedule import wxSchedule, wxScheduleView
+from wxDrawer import wxBaseDrawer, wxFancyDrawer, wxDrawerMetrics
 from wxSchedulerCore import *
-import calendar
+from wxSchedulerLayout import wxLayoutState, wxLayoutCache, computeLayout, computeHeaderLayout, \
+     relayoutPeriods, HEADER_DAY, HEADER_MONTH
+from wxResourcePool import wxResourcePool
+from wxSpatialIndex import wxSpatialIndex
+from wxTileCache import wxTileCache
 import math
 import sys
 import wx
@@ -27,6 +31,11 @@ EVT_SCHEDULE_DCLICK = wx.PyEventBinder( wxEVT_COMMAND_SCHEDULE_DCLICK )
 wxEVT_COMMAND_PERIODWIDTH_CHANGED = wx.NewEventType()
 EVT_PERIODWIDTH_CHANGED = wx.PyEventBinder( wxEVT_COMMAND_PERIODWIDTH_CHANGED )
 
+def _intersects( rect, x, y, w, h ):
+	rx, ry, rw, rh = rect
+	return x < rx + rw and x + w > rx and y < ry + rh and y + h > ry
+
+
 class wxSchedulerSizer(wx.PySizer):
 	def __init__(self, minSizeCallback):
 		super(wxSchedulerSizer, self).__init__()
@@ -45,19 +54,34 @@ class wxSchedulerPaint( object ):
 
 		self._resizable		= False
 		self._style = wxSCHEDULER_VERTICAL
+		self._rowPacking = wxSCHEDULER_PACKING_MINIMAL
 
 		self._drawerClass = wxBaseDrawer
 		self._headerPanel = None
 
 		self._schedulesCoords = list()
+		self._schedulesIndex = wxSpatialIndex()
 		self._schedulesPages = dict()
 
-		self._datetimeCoords = []
+		self._slotGrid = None
+		self._layoutCache = wxLayoutCache()
+		self._layout = None
 
 		self._bitmap = None
+		self._bufferSize = (0, 0)
+		self._resources = wxResourcePool()
+
+		# Layers: the grid (headers, hours, day backgrounds), and the
+		# schedules drawn over it; the overlay is drawn when painting.
+		self._gridTiles = wxTileCache(TILE_SIZE, TILE_CACHE_BUDGET // 2)
+		self._scheduleTiles = wxTileCache(TILE_SIZE, TILE_CACHE_BUDGET - TILE_CACHE_BUDGET // 2)
+		self._gridKey = None
+		self._dragGhost = None
+		self._nowLines = []
+		self._visibleOrigin = None
+		self._scrollDirection = (0, 0)
 		self._minSize = None
 		self._drawHeaders = True
-		self._guardRedraw = False
 
 		self._periodWidth = 150
 		self._headerBounds = []
@@ -142,7 +166,7 @@ class wxSchedulerPaint( object ):
 
 	def _doMove( self, point ):
 		if self._scheduleDraggingState in [0, 3, 4]:
-			for sched, pointMin, pointMax in self._schedulesCoords:
+			for sched, pointMin, pointMax in self._schedulesIndex.ItemsAt( point.x, point.y, 4 ):
 				if self._style == wxSCHEDULER_VERTICAL:
 					if point.x > pointMin.x and point.x < pointMax.x:
 						if abs(point.y - pointMin.y) < 4:
@@ -188,27 +212,24 @@ class wxSchedulerPaint( object ):
 		pp = wx.Point(point.x + dx, point.y + dy)
 		if pp.y < 0:
 			pp.y = 0
-		if pp.y >= self._bitmap.GetHeight():
-			pp.y = self._bitmap.GetHeight() - 1
+		if pp.y >= self._bufferSize[1]:
+			pp.y = self._bufferSize[1] - 1
 		if pp.x < 0:
 			pp.x = 0
-		if pp.x >= self._bitmap.GetWidth():
-			pp.x = self._bitmap.GetWidth() - 1
+		if pp.x >= self._bufferSize[0]:
+			pp.x = self._bufferSize[0] - 1
 
-		for idx, (dt, pointMin, pointMax) in enumerate(self._datetimeCoords):
-			if pp.y >= pointMin.y and pp.y <= pointMax.y and pp.x >= pointMin.x and pp.x <= pointMax.x:
-				break
-		else:
-			idx = -1
+		slot = self._slotAt( pp )
+
+		if slot is not None:
+			pointMin, pointMax, theTime = slot
 
-		if idx >= 0:
 			if self._scheduleDraggingStick:
 				if self._style == wxSCHEDULER_VERTICAL:
 					pp = wx.Point( pp.x, pointMin.y )
 				else:
 					pp = wx.Point( pointMin.x, pp.y )
 
-			theTime = utils.copyDateTime( dt )
 			if self._style == wxSCHEDULER_VERTICAL:
 				theTime.AddTS( wx.TimeSpan.Minutes( int(30.0 * (pp.y - pointMin.y) / (pointMax.y - pointMin.y)) ) )
 			else:
@@ -279,29 +300,23 @@ class wxSchedulerPaint( object ):
 		return rMin, rMax, theTime
 
 	def _drawDragging( self, point, coords ):
-		if self._scheduleDraggingPrevious is not None:
-			x, y = self.GetViewStart()
-			mx, my = self.GetScrollPixelsPerUnit()
-			x *= mx
-			y *= my
-			rMin, rMax, _ = coords( self._scheduleDraggingPrevious )
-			self.RefreshRect( wx.Rect( rMin.x - x, rMin.y - y,
-						   rMax.x - rMin.x, rMax.y - rMin.y ) )
-			try:
-				wx.Yield()
-			except:
-				pass
+		"""
+		Moves the ghost of the dragged schedule, drawn over the view
+		by OnPaint, to where 'point' puts it; None removes it.
+		"""
+		if self._dragGhost is not None:
+			self._repaintViewRect(*self._dragGhost[:4])
 
 		self._scheduleDraggingPrevious = point
 
 		if point is not None:
 			rMin, rMax, _ = coords( point )
 
-			dc = wx.ClientDC( self )
-			self.PrepareDC( dc )
-			dc.SetBrush( wx.Brush( self._scheduleDragged[2].GetColor() ) )
-			dc.SetPen( wx.BLACK_PEN )
-			dc.DrawRoundedRectangle( rMin.x, rMin.y, rMax.x - rMin.x, rMax.y - rMin.y, 5 )
+			self._dragGhost = (rMin.x, rMin.y, rMax.x - rMin.x, rMax.y - rMin.y,
+					   self._scheduleDragged[2].GetColor())
+			self._repaintViewRect(*self._dragGhost[:4])
+		else:
+			self._dragGhost = None
 
 	def _doRightClickControl( self, point ):
 		self._processEvt( wxEVT_COMMAND_SCHEDULE_RIGHT_CLICK, point )
@@ -314,24 +329,30 @@ class wxSchedulerPaint( object ):
 		Check if the point is on a schedule and return the schedule and its
 		coordinates
 		"""
-		for schedule, pointMin, pointMax in self._schedulesCoords:
-			inX = ( pointMin.x <= point.x ) & ( point.x <= pointMax.x )
-			inY = ( pointMin.y <= point.y ) & ( point.y <= pointMax.y )
-			
-			if inX & inY:
-				return pointMin, pointMax, schedule.GetClientData()
+		for schedule, pointMin, pointMax in self._schedulesIndex.ItemsAt( point.x, point.y ):
+			return pointMin, pointMax, schedule.GetClientData()
+
+		return self._slotAt( point )
+
+	def _slotAt( self, point ):
+		"""
+		Returns the corners and the start of the time slot under the
+		point, or None
+		"""
+		if self._slotGrid is None:
+			return None
 
-		for dt, pointMin, pointMax in self._datetimeCoords:
-			inX = ( pointMin.x <= point.x ) & ( point.x <= pointMax.x )
-			inY = ( pointMin.y <= point.y ) & ( point.y <= pointMax.y )
-			
-			if inX & inY:
-				return pointMin, pointMax, dt
+		slot = self._slotGrid.HitTest( point.x, point.y )
+		if slot is None:
+			return None
+
+		day, minute, ( x1, y1, x2, y2 ) = slot
+		return wx.Point( x1, y1 ), wx.Point( x2, y2 ), utils.secondsToDateTime( day * 86400 + minute * 60 )
 
 
 	def _getSchedInPeriod( schedules, start, end):
 		"""
-		Returns a list of copied schedules that intersect with
+		Returns a list of  wxScheduleView that intersect with
 		the  period  defined by	 'start'  and 'end'.  Schedule
 		start and end are trimmed so as to lie between 'start'
 		and 'end'.
@@ -347,16 +368,14 @@ class wxSchedulerPaint( object ):
 				if start.IsLaterThan(schedule.end):
 					continue
 
-				newSchedule = schedule.Clone()
-				# This is used to find the original schedule object in _findSchedule.
-				newSchedule.clientdata	= schedule
-
+				viewStart = viewEnd = None
 				if start.IsLaterThan(schedule.start):
-					newSchedule.start = utils.copyDateTime(start)
+					viewStart = utils.copyDateTime(start)
 				if schedule.end.IsLaterThan(end):
-					newSchedule.end = utils.copyDateTime(end)
+					viewEnd = utils.copyDateTime(end)
 
-				results.append(newSchedule)
+				# The view's clientdata is the original schedule; _findSchedule relies on it.
+				results.append(wxScheduleView(schedule, viewStart, viewEnd))
 			except wx.PyDeadObjectError:
 				pass
 
@@ -364,453 +383,362 @@ class wxSchedulerPaint( object ):
 
 	_getSchedInPeriod = staticmethod(_getSchedInPeriod)
 
-	def _splitSchedules( self, schedules ):
+	def _getWorkingHours( self ):
 		"""
-		Returns	 a list	 of lists  of schedules.  Schedules in
-		each list are guaranteed not to collide.
+		Returns the displayed working hours as a list of
+		(start, end) wx.DateTime pairs.
 		"""
-		results = []
-		current = []
-
-		schedules = schedules[:] # Don't alter original list
-
-		def findNext(schedule):
-			# Among schedules that start after this one ends, find the "nearest".
-			candidateSchedule = None
-			minDelta = None
-			for sched in schedules:
-				if sched.start.IsLaterThan(schedule.end) or sched.start.IsEqualTo(schedule.end):
-					delta = sched.start.Subtract(schedule.end)
-					if minDelta is None or minDelta > delta:
-						minDelta = delta
-						candidateSchedule = sched
-			return candidateSchedule
-
-		while schedules:
-			schedule = schedules[0]
-			while schedule:
-				current.append(schedule)
-				schedules.remove(schedule)
-				schedule = findNext(schedule)
-			results.append(current)
-			current = []
-
-		return results
-
-	def _paintPeriod(self, drawer, start, daysCount, x, y, width, height, highlight=None):
-		end = utils.copyDateTime(start)
-		end.AddDS(wx.DateSpan(days=daysCount))
-
-		blocks = self._splitSchedules(self._getSchedInPeriod(self._schedules, start, end))
-		offsetY = 0
-
 		if self._showOnlyWorkHour:
-			workingHours = [(self._startingHour, self._startingPauseHour),
-					(self._endingPauseHour, self._endingHour)]
-		else:
-			workingHours = [(self._startingHour, self._endingHour)]
-
-		if not self.pageNumber:
-			self.pageCount = 1
-			self.pageLimits = [0]
-
-			pageHeight = self.GetSize().GetHeight() - 20
-			currentPageHeight = y
-
-		for dayN in xrange(daysCount):
-			theDay = utils.copyDateTime(start)
-			theDay.AddDS(wx.DateSpan(days=dayN))
-			theDay.SetSecond(0)
-			color = highlight
-			if theDay.IsSameDate( wx.DateTime.Now() ):
-				if self._viewType != wxSCHEDULER_DAILY or daysCount >= 2:
-					color = self._highlightColor
-			drawer.DrawDayBackground( x + 1.0 * width / daysCount * dayN, y, 1.0 * width / daysCount, height,
-						  highlight=color )
-
-		if blocks:
-			dayWidth = width / len(blocks)
-
-			for idx, block in enumerate(blocks):
-				maxDY = 0
-
-				for schedule in block:
-					show = True
-					if self.pageNumber is not None:
-						if self._schedulesPages.get(schedule.GetId(), None) != self.pageNumber:
-							show = False
-
-					if show:
-						if self._style == wxSCHEDULER_VERTICAL:
-							xx, yy, w, h = drawer.DrawScheduleVertical(schedule, start, workingHours,
-												   x + dayWidth * idx, y,
-												   dayWidth, height)
-						elif self._style == wxSCHEDULER_HORIZONTAL:
-							xx, yy, w, h = drawer.DrawScheduleHorizontal(schedule, start, daysCount, workingHours,
-												     x, y + offsetY, width, height)
-							maxDY = max(maxDY, h)
-
-						if self.pageNumber is None:
-							if currentPageHeight + h >= pageHeight:
-								pageNo = self.pageCount + 1
-							else:
-								pageNo = self.pageCount
-
-							self._schedulesPages[schedule.GetId()] = pageNo
-
-						self._schedulesCoords.append((schedule, wx.Point(xx, yy), wx.Point(xx + w, yy + h)))
-					else:
-						schedule.Destroy()
+			return [(self._startingHour, self._startingPauseHour),
+				(self._endingPauseHour, self._endingHour)]
+		return [(self._startingHour, self._endingHour)]
 
-				offsetY += maxDY
+	def _getLayoutState( self, width, height ):
+		"""
+		Returns the wxLayoutState of the current view.
+		"""
+		if isinstance(self, wx.ScrolledWindow):
+			clientWidth = self.GetSizeTuple()[0]
+		else:
+			clientWidth = width
+
+		return wxLayoutState(viewType=self._viewType,
+				     style=self._style,
+				     day=utils.dateToOrdinal(self.GetDate()),
+				     today=utils.dateToOrdinal(wx.DateTime.Now()),
+				     periodCount=self._periodCount,
+				     weekStart=self._weekstart,
+				     workingHours=[(start.GetHour() * 60 + start.GetMinute(), end.GetHour() * 60 + end.GetMinute())
+						   for start, end in self._getWorkingHours()],
+				     displayedSlots=[hour.GetHour() * 60 + hour.GetMinute() for hour in self._lstDisplayedHours],
+				     width=width,
+				     height=height,
+				     periodWidth=self._periodWidth,
+				     drawHeaders=self._drawHeaders,
+				     scrolled=isinstance(self, wx.ScrolledWindow),
+				     clientWidth=clientWidth,
+				     pageNumber=self.pageNumber,
+				     pageHeight=self.GetSize().GetHeight() - 20,
+				     schedulePages=self._schedulesPages,
+				     rowPacking=self._rowPacking,
+				     leftColumnSize=LEFT_COLUMN_SIZE,
+				     daySizeMin=(DAY_SIZE_MIN.width, DAY_SIZE_MIN.height),
+				     weekSizeMin=(WEEK_SIZE_MIN.width, WEEK_SIZE_MIN.height),
+				     monthCellSizeMin=(MONTH_CELL_SIZE_MIN.width, MONTH_CELL_SIZE_MIN.height),
+				     scheduleMargin=SCHEDULE_OUTSIDE_MARGIN)
+
+	def _computeLayout( self, drawer, x, y, width, height ):
+		"""
+		Lays the view out; the drawer is only used to measure text.
+		Layouts are cached by view state, drawer class and schedule
+		set revision, except when printing a given page.
+		"""
+		state = self._getLayoutState(width, height)
+		if self.pageNumber is not None:
+			return computeLayout(state, self._index.QueryIntervals, wxDrawerMetrics(drawer), x, y)
 
-				if not self.pageNumber:
-					currentPageHeight += maxDY
-					if currentPageHeight >= pageHeight:
-						self.pageLimits.append(currentPageHeight - maxDY)
-						currentPageHeight = maxDY
-						self.pageCount += 1
+		key = self._layoutKey(state, x, y, drawer.__class__)
 
-		now = wx.DateTime.Now()
+		layout = self._layoutCache.Get(key)
+		if layout is None:
+			layout = computeLayout(state, self._index.QueryIntervals, wxDrawerMetrics(drawer), x, y)
+			self._layoutCache.Put(key, layout)
 
-		for dayN in xrange(daysCount):
-			theDay = utils.copyDateTime(start)
-			theDay.AddDS(wx.DateSpan(days=dayN))
-			theDay.SetSecond(0)
+		return layout
 
-			nbHours = len(self._lstDisplayedHours)
+	def _layoutKey( self, state, x, y, drawerClass ):
+		return (state.Key(), x, y, drawerClass, self._revision)
 
-			for idx, hour in enumerate(self._lstDisplayedHours):
-				theDay.SetHour(hour.GetHour())
-				theDay.SetMinute(hour.GetMinute())
+	def _getContext( self, dc, origin=(0, 0) ):
+		"""
+		Returns what the drawer class draws on: the DC itself or a
+		GraphicsContext created on it. Both, and the DC afterwards,
+		take view coordinates, 'origin' being the view point drawn
+		at (0, 0) in the DC.
+		"""
+		# Whether a GraphicsContext follows the device origin of its
+		# DC depends on the platform, so it is translated itself.
+		dc.SetDeviceOrigin(0, 0)
+
+		if self._drawerClass.use_gc:
+			context = wx.GraphicsContext.Create(dc)
+			context.Translate(-origin[0], -origin[1])
+			context.SetFont(wx.NORMAL_FONT, wx.BLACK)
+		else:
+			context = dc
+			context.SetFont(wx.NORMAL_FONT)
 
-				if self._minSize is None or not self._resizable:
-					if self._style == wxSCHEDULER_VERTICAL:
-						self._datetimeCoords.append((utils.copyDateTime(theDay),
-									     wx.Point(x + 1.0 * width * dayN / daysCount,
-										      y + 1.0 * height * idx / nbHours),
-									     wx.Point(x + 1.0 * width * (dayN + 1) / daysCount,
-										      y + 1.0 * height * (idx + 1) / nbHours)))
-					else:
-						self._datetimeCoords.append((utils.copyDateTime(theDay),
-									     wx.Point(x + 1.0 * width * (nbHours * dayN + idx) / (nbHours * daysCount),
-										      y),
-									     wx.Point(x + 1.0 * width * (nbHours * dayN + idx + 1) / (nbHours * daysCount),
-										      y + height)))
-
-		if isinstance(self, wx.ScrolledWindow) and self._showNow:
-			now = wx.DateTime.Now()
-			# This assumes self._lstDisplayedHours is sorted of course
-			for dayN in xrange(daysCount):
-				theDay = utils.copyDateTime(start)
-				theDay.AddDS(wx.DateSpan(days=dayN))
-				if theDay.IsSameDate(now):
-					theDay.SetSecond(0)
-					previous = None
-					for idx, hour in enumerate(self._lstDisplayedHours):
-						theDay.SetHour(hour.GetHour())
-						theDay.SetMinute(hour.GetMinute())
-						if theDay.IsLaterThan(now):
-							if idx != 0:
-								if self._style == wxSCHEDULER_VERTICAL:
-									yPrev = y + 1.0 * height * (idx - 1) / nbHours
-									delta = 1.0 * height / nbHours * now.Subtract(previous).GetSeconds() \
-										/ theDay.Subtract(previous).GetSeconds()
-									drawer.DrawNowHorizontal(x, yPrev + delta, width)
-								else:
-									xPrev = x + 1.0 * width * (nbHours * dayN + idx - 1) / (nbHours * daysCount)
-									delta = 1.0 * width / (nbHours * daysCount) * now.Subtract(previous).GetSeconds() \
-										/ theDay.Subtract(previous).GetSeconds()
-									drawer.DrawNowVertical(xPrev + delta, y, height)
-							break
-						previous = utils.copyDateTime( theDay )
-					break
+		dc.SetDeviceOrigin(-origin[0], -origin[1])
 
-		if self._style == wxSCHEDULER_VERTICAL:
-			return max(width, DAY_SIZE_MIN.width), max(height, DAY_SIZE_MIN.height)
-		else:
-			return max(width, self._periodWidth), offsetY
+		return context
 
-	def _paintDay( self, drawer, day, x, y, width, height ):
+	def _getMeasuringDC( self ):
 		"""
-		Draw column schedules
+		Returns a memory DC to measure text on; the caller deselects
+		its bitmap when done.
 		"""
+		memDC = wx.MemoryDC()
+		memDC.SelectObject(wx.EmptyBitmap(1, 1))
+		memDC.SetFont(wx.NORMAL_FONT)
 
-		start = utils.copyDateTime(day)
-		start.SetHour(0)
-		start.SetMinute(0)
-		start.SetSecond(0)
-
-		color = None
-		if day.IsSameDate(wx.DateTime.Now()) and self._periodCount >= 2:
-			color = self._highlightColor
-
-		return self._paintPeriod(drawer, start, 1, x, y, width, height, highlight=color)
+		return memDC
 
-	def _paintDailyHeaders( self, drawer, day, x, y, width, height, includeText=True ):
-		if self._style == wxSCHEDULER_HORIZONTAL:
-			self._headerBounds.append((x, y, height))
+	def _getVisibleRect( self ):
+		"""
+		Returns the (x, y, w, h) part of the view shown in the window.
+		"""
+		originX, originY = self.GetViewStart()
+		unitX, unitY = self.GetScrollPixelsPerUnit()
+		width, height = self.GetClientSizeTuple()
 
-		if includeText:
-			color = None
-			if day.IsSameDate( wx.DateTime.Now() ):
-				if self._viewType != wxSCHEDULER_DAILY or self._periodCount >= 2:
-					color = self._highlightColor
-			w, h = drawer.DrawDayHeader(day, x, y, width, height, highlight=color)
-		else:
-			w, h = width, 0
+		return originX * unitX, originY * unitY, width, height
 
-		if not (self._style == wxSCHEDULER_VERTICAL or self._drawHeaders):
-			hw, hh = drawer.DrawHours(x, y + h, width, height - h, self._style, includeText=includeText)
-			h += hh
+	def _repaintViewRect( self, x, y, w, h ):
+		"""
+		Repaints a rectangle of the view from the cached tiles, e.g.
+		after the overlay moved.
+		"""
+		originX, originY = self.GetViewStart()
+		unitX, unitY = self.GetScrollPixelsPerUnit()
+		self.RefreshRect(wx.Rect(x - originX * unitX - 1, y - originY * unitY - 1, w + 3, h + 3))
 
-		return w, h
+	def _refreshViewRect( self, x, y, w, h ):
+		"""
+		Drops the schedules layer tiles of a rectangle of the view and
+		repaints it.
+		"""
+		self._scheduleTiles.InvalidateRect(x, y, w, h)
+		self._repaintViewRect(x, y, w, h)
 
-	def _paintDaily( self, drawer, day, x, y, width, height ):
+	def _relayoutSchedule( self, schedule, previous ):
 		"""
-		Display day schedules
+		Updates the view after a change of the schedule's extent or
+		text; 'previous' is the extent it had in the index, or None.
+		Only the day columns showing it before or after the change
+		are laid out again, and only their tiles are dropped. Returns
+		False when the view is not made of day columns; a full refresh
+		is needed then.
 		"""
+		layout = self._layout
+		if layout is None or not layout.IsIncremental():
+			return False
 
-		minWidth = minHeight = 0
+		periods = set()
+		for interval in (previous, self._index.GetInterval(schedule)):
+			if interval is not None:
+				periods.update(layout.GetPeriodsInRange(*interval))
 
-		if self._style == wxSCHEDULER_VERTICAL:
-			x += LEFT_COLUMN_SIZE
-			width -= LEFT_COLUMN_SIZE
-
-		theDay = utils.copyDateTime(day)
-
-		if self._drawHeaders:
-			maxDY = 0
-			for idx in xrange(self._periodCount):
-				w, h = self._paintDailyHeaders( drawer, theDay, x + 1.0 * width / self._periodCount * idx, y, 1.0 * width / self._periodCount, height)
-				maxDY = max(maxDY, h)
-				theDay.AddDS(wx.DateSpan(days=1))
-			minHeight += maxDY
-			y += maxDY
-			height -= maxDY
-		else:
-			for idx in xrange(self._periodCount):
-				self._paintDailyHeaders( drawer, theDay, x + 1.0 * width / self._periodCount * idx, y, 1.0 * width / self._periodCount, height, includeText=False )
-				theDay.AddDS(wx.DateSpan(days=1))
+		# It may not be drawn any more
+		schedule.bounds = None
 
-		if self._style == wxSCHEDULER_VERTICAL:
-			x -= LEFT_COLUMN_SIZE
-			width += LEFT_COLUMN_SIZE
-
-		if self._style == wxSCHEDULER_VERTICAL or self._drawHeaders:
-			if self._style == wxSCHEDULER_VERTICAL:
-				w, h = drawer.DrawHours(x, y, width, height, self._style)
-			else:
-				maxDY = 0
-				for idx in xrange(self._periodCount):
-					_, h = drawer.DrawHours(x + 1.0 * width / self._periodCount * idx, y, 1.0 * width / self._periodCount, height, self._style)
-					maxDY = max(maxDY, h)
-				w = 0
-				h = maxDY
-		else:
-			w, h = 0, 0
+		memDC = self._getMeasuringDC()
+		try:
+			relayoutPeriods(layout, self._index.QueryIntervals,
+					wxDrawerMetrics(self._drawerClass(self._getContext(memDC), self._lstDisplayedHours)),
+					periods)
+		finally:
+			memDC.SelectObject(wx.NullBitmap)
 
-		if self._style == wxSCHEDULER_VERTICAL:
-			minWidth += w
-			x += w
-			width -= w
-		else:
-			minHeight += h
-			y += h
-			height -= h
+		self._recordLayout(layout, partial=True)
+		self._layoutCache.Put(self._layoutKey(layout.state, layout.x, layout.y, self._drawerClass), layout)
 
-		if self._style == wxSCHEDULER_HORIZONTAL:
-			# Use directly paintPeriod or pagination fails
-			w, h = self._paintPeriod(drawer, day, self._periodCount, x, y, width, height)
-		else:
-			w = 0
-			maxDY = 0
-			theDay = utils.copyDateTime(day)
-			for idx in xrange(self._periodCount):
-				dw, dh = self._paintDay( drawer, theDay, x + 1.0 * width / self._periodCount * idx, y, 1.0 * width / self._periodCount, height )
-				w += dw
-				maxDY = max(maxDY, dh)
-				theDay.AddDS(wx.DateSpan(days=1))
-
-		minWidth += w
-		minHeight += h
-
-		return minWidth, minHeight
-
-	def _paintWeeklyHeaders( self, drawer, day, x, y, width, height ):
-		firstDay = utils.setToWeekDayInSameWeek( day, 0, self._weekstart )
-		firstDay.SetHour(0)
-		firstDay.SetMinute(0)
-		firstDay.SetSecond(0)
-
-		maxDY = 0
-
-		for weekday in xrange(7):
-			theDay = utils.setToWeekDayInSameWeek(utils.copyDateTime(firstDay), weekday, self._weekstart)
-			if theDay.IsSameDate( wx.DateTime.Now() ):
-				color = self._highlightColor
-			else:
-				color = None
-			w, h = drawer.DrawDayHeader(theDay, x + weekday * 1.0 * width / 7, y, 1.0 * width / 7, height,
-						    highlight=color)
-			self._headerBounds.append((int(x + (weekday + 1) * 1.0 * width / 7), y, height))
-			maxDY = max(maxDY, h)
+		for index in periods:
+			period = layout.periods[index]
+			x, y = int(math.floor(period.x)), int(math.floor(period.y))
+			self._refreshViewRect(x, y, int(math.ceil(period.x + period.w)) - x, int(math.ceil(period.y + period.h)) - y)
 
-		return maxDY
+		return True
 
-	def _paintWeekly( self, drawer, day, x, y, width, height ):
+	def _segmentView( self, segment ):
 		"""
-		Display weekly schedule
+		Returns the wxScheduleView to draw for a wxLayoutSegment.
 		"""
+		start = end = None
+		if segment.clipStart:
+			start = utils.secondsToDateTime(segment.start)
+		if segment.clipEnd:
+			end = utils.secondsToDateTime(segment.end)
 
-		firstDay = utils.setToWeekDayInSameWeek( day, 0, self._weekstart )
-		firstDay.SetHour(0)
-		firstDay.SetMinute(0)
-		firstDay.SetSecond(0)
+		# The view's clientdata is the original schedule; _findSchedule relies on it.
+		return wxScheduleView(segment.schedule, start, end)
 
-		minWidth = minHeight = 0
+	def _renderHeaders( self, drawer, layout, rect=None ):
+		for kind, day, x, y, w, h, highlight in layout.headers:
+			if rect is not None and not _intersects(rect, x, y, w, h):
+				continue
 
-		if self._style == wxSCHEDULER_VERTICAL:
-			x += LEFT_COLUMN_SIZE
-			width -= LEFT_COLUMN_SIZE
+			day = utils.ordinalToDate(day)
+			color = None
+			if highlight:
+				color = self._highlightColor
 
-		maxDY = 0
+			if kind == HEADER_DAY:
+				drawer.DrawDayHeader(day, x, y, w, h, highlight=color)
+			elif kind == HEADER_MONTH:
+				drawer.DrawMonthHeader(day, x, y, w, h)
+			else:
+				drawer.DrawSimpleDayHeader(day, x, y, w, h, highlight=color)
 
-		if self._drawHeaders:
-			theDay = utils.copyDateTime(day)
-			for idx in xrange(self._periodCount):
-				maxDY = max(maxDY, self._paintWeeklyHeaders( drawer, theDay, x + 1.0 * width / self._periodCount * idx, y, 1.0 * width / self._periodCount, height ))
-				theDay.AddDS(wx.DateSpan(weeks=1))
+		for x, y, w, h, includeText in layout.hours:
+			if rect is None or _intersects(rect, x, y, w, h):
+				drawer.DrawHours(x, y, w, h, self._style, includeText=includeText)
 
-		if self._style == wxSCHEDULER_VERTICAL:
-			x -= LEFT_COLUMN_SIZE
-			width += LEFT_COLUMN_SIZE
-
-		minHeight += maxDY
-		y += maxDY
-		height -= maxDY
+	def _recordLayout( self, layout, partial=False ):
+		"""
+		Records what the mouse handlers need to know about a layout:
+		schedule rectangles, time slots and pages. 'partial' tells
+		that some periods only were laid out again, so that schedules
+		keep their bounds.
+		"""
+		if not partial:
+			for schedule, _, _ in self._schedulesCoords:
+				# Schedules out of the new range are not drawn any
+				# more, so forget their bounds here.
+				try:
+					schedule.clientdata.bounds = None
+				except wx.PyDeadObjectError:
+					pass
 
-		if self._style == wxSCHEDULER_VERTICAL:
-			w, h = drawer.DrawHours(x, y, width, height, self._style)
+		self._schedulesCoords = list()
 
-			minWidth += w
-			x += w
-			width -= w
+		for segment in layout.segments:
+			x, y, w, h = segment.GetRect()
+			self._schedulesCoords.append((self._segmentView(segment), wx.Point(x, y), wx.Point(x + w, y + h)))
 
-			day = utils.copyDateTime(firstDay)
+		rects = [(coords, coords[1].x, coords[1].y, coords[2].x, coords[2].y) for coords in self._schedulesCoords]
 
-			for idx in xrange(self._periodCount):
-				for weekday in xrange(7):
-					theDay = utils.setToWeekDayInSameWeek(utils.copyDateTime(day), weekday, self._weekstart)
-					self._paintDay(drawer, theDay, x + (weekday + 7 * idx) * 1.0 * width / 7 / self._periodCount, y, 1.0 * width / 7 / self._periodCount, height)
-				day.AddDS(wx.DateSpan(weeks=1))
+		# The drawer places the schedules of compact month cells: those
+		# of the cells drawn so far are kept by the layout, the others
+		# are recorded when drawn. Cached tiles may not draw them again.
+		cells = layout.GetPlacedCells()
+		self._schedulesCoords.extend(rect[0] for rect in cells)
 
-			return max(WEEK_SIZE_MIN.width * self._periodCount + LEFT_COLUMN_SIZE, width), max(WEEK_SIZE_MIN.height, height)
-		else:
-			w, h = self._paintPeriod(drawer, firstDay, 7 * self._periodCount, x, y, width, height)
+		self._schedulesIndex = wxSpatialIndex(rects + cells)
 
-			minWidth += w
-			minHeight += h
+		self._slotGrid = layout.slotGrid
 
-			return max(self._periodWidth * self._periodCount + LEFT_COLUMN_SIZE, minWidth), minHeight
+		if layout.pageCount is not None:
+			self.pageCount = layout.pageCount
+			self.pageLimits = layout.pageLimits
+		if self.pageNumber is None:
+			self._schedulesPages.update(layout.schedulePages)
 
-	def _paintMonthlyHeaders( self, drawer, day, x, y, width, height ):
-		if isinstance(self, wx.ScrolledWindow):
-			_, h = drawer.DrawMonthHeader(day, 0, 0, self.GetSizeTuple()[0], height)
-			w = width
-		else:
-			w, h = drawer.DrawMonthHeader(day, x, y, width, height)
+		self._layout = layout
+		self._updateNowLines()
 
-		if self._style == wxSCHEDULER_HORIZONTAL:
-			day.SetDay(1)
-			day.SetHour(0)
-			day.SetMinute(0)
-			day.SetSecond(0)
+	def _renderLayout( self, drawer, layout, rect=None ):
+		"""
+		Draws a recorded wxLayout (see _recordLayout), or only what
+		intersects 'rect' if it is given; the caller clips to it.
+		"""
+		self._renderGrid(drawer, layout, rect)
+		self._renderSchedules(drawer, layout, rect)
+		self._renderOverlay(drawer, layout, rect)
 
-			daysCount = wx.DateTime.GetNumberOfDaysInMonth(day.GetMonth())
+	def _renderGrid( self, drawer, layout, rect=None ):
+		"""
+		Draws what only depends on the view: headers, hours and day
+		backgrounds.
+		"""
+		self._renderHeaders(drawer, layout, rect)
 
-			maxDY = 0
-			for idx in xrange(daysCount):
-				theDay = utils.copyDateTime(day)
-				theDay.AddDS(wx.DateSpan(days=idx))
-				if theDay.IsSameDate( wx.DateTime.Now() ):
+		for day, x, y, w, h, highlight in layout.days:
+			if rect is None or _intersects(rect, x, y, w, h):
+				color = None
+				if highlight:
 					color = self._highlightColor
-				else:
-					color = None
-				w, h = drawer.DrawSimpleDayHeader(theDay, x + 1.0 * idx * width / daysCount,
-								  y + h, 1.0 * width / daysCount, height,
-								  highlight=color)
-				self._headerBounds.append((x + 1.0 * (idx + 1) * width / daysCount, y + h, height))
-				maxDY = max(maxDY, h)
-
-			h += maxDY
+				drawer.DrawDayBackground(x, y, w, h, highlight=color)
 
-		return w, h
-
-	def _paintMonthly( self, drawer, day, x, y, width, height):
+	def _renderSchedules( self, drawer, layout, rect=None ):
 		"""
-		Draw month's calendar using calendar module functions
+		Draws the schedules, over the grid.
 		"""
+		for segment in layout.segments:
+			x, y, w, h = segment.GetRect()
 
-		if self._drawHeaders:
-			w, h = self._paintMonthlyHeaders( drawer, day, x, y, width, height)
-		else:
-			w, h = width, 0
+			if rect is None or _intersects(rect, x, y, w, h):
+				drawer.DrawSchedule(self._segmentView(segment), x, y, w, h)
 
-		y += h
-		height -= h
+		for index, (day, x, y, w, h, segments) in enumerate(layout.cells):
+			if rect is not None and not _intersects(rect, x, y, w, h):
+				continue
 
-		if self._style == wxSCHEDULER_VERTICAL:
-			month = calendar.monthcalendar( day.GetYear(), day.GetMonth() + 1 )
+			if day is not None:
+				day = utils.ordinalToDate(day)
 
-			for w, monthWeek in enumerate( month ):
-				for d, monthDay in enumerate( monthWeek ):
-					cellW, cellH = 1.0 * width / 7, 1.0 * height / len(month)
+			displayed = drawer.DrawSchedulesCompact(day, [self._segmentView(segment) for segment in segments],
+								x, y, w, h, self._highlightColor)
 
-					if monthDay == 0:
-						theDay = None
-						schedules = []
-					else:
-						theDay = day
-						theDay.SetDay(monthDay)
-						theDay.SetHour(0)
-						theDay.SetMinute(0)
-						theDay.SetSecond(0)
+			rects = [(coords, coords[1].x, coords[1].y, coords[2].x, coords[2].y) for coords in displayed]
 
-						end = utils.copyDateTime(theDay)
-						end.AddDS(wx.DateSpan(days=1))
+			if layout.PlaceCell(index, rects) and layout is self._layout:
+				self._schedulesCoords.extend(displayed)
+				for rect in rects:
+					self._schedulesIndex.Add(*rect)
 
-						schedules = self._getSchedInPeriod(self._schedules, theDay, end)
+	def _renderOverlay( self, drawer, layout, rect=None ):
+		"""
+		Draws what changes while the layout does not: the 'now' line,
+		as computed by _updateNowLines. Scrolled views draw it over
+		the tiles when painting.
+		"""
+		for vertical, x, y, length in self._nowLines:
+			if rect is not None and not _intersects(rect, *self._nowLineRect(vertical, x, y, length)):
+				continue
 
-						if self._minSize is None or not self._resizable:
-							self._datetimeCoords.append((utils.copyDateTime(theDay),
-										     wx.Point(d * cellW, w * cellH),
-										     wx.Point(d * cellW + cellW, w * cellH + cellH)))
+			if vertical:
+				drawer.DrawNowVertical(x, y, length)
+			else:
+				drawer.DrawNowHorizontal(x, y, length)
 
-					displayed = drawer.DrawSchedulesCompact(theDay, schedules, d * cellW,
-										w * cellH + y, cellW, cellH,
-										self._highlightColor)
-					self._schedulesCoords.extend( displayed )
+	def _updateNowLines( self ):
+		"""
+		Computes where the 'now' line crosses the periods of the
+		current layout, from their time axis, as (vertical, x, y,
+		length) tuples. Returns the rectangles of the view which
+		must be painted again: where the line was, and where it is.
+		"""
+		lines = []
+
+		layout = self._layout
+		if layout is not None and isinstance(self, wx.ScrolledWindow) and self._showNow:
+			now = utils.dateTimeToSeconds(wx.DateTime.Now()) / 60.0
+			for period in layout.periods:
+				axis = period.axis
+				if axis.Contains(now) and axis.GetTotal():
+					position = 1.0 * axis.Position(now) / axis.GetTotal()
+					if self._style == wxSCHEDULER_VERTICAL:
+						lines.append((False, period.x, period.y + period.h * position, period.w))
+					else:
+						lines.append((True, period.x + period.w * position, period.y, period.h))
 
-					for schedule in set(schedules) - set([sched for sched, _, _ in displayed]):
-						schedule.Destroy()
+		if lines == self._nowLines:
+			return []
 
-			return (max(MONTH_CELL_SIZE_MIN.width * 7, width),
-				max(MONTH_CELL_SIZE_MIN.height * (w + 1), height))
-		else:
-			day.SetDay(1)
-			day.SetHour(0)
-			day.SetMinute(0)
-			day.SetSecond(0)
+		rects = [self._nowLineRect(*line) for line in self._nowLines + lines]
+		self._nowLines = lines
 
-			daysCount = wx.DateTime.GetNumberOfDaysInMonth(day.GetMonth())
+		return rects
 
-			minHeight = h
+	def _nowLineRect( self, vertical, x, y, length ):
+		# What the drawers may cover when drawing a 'now' line
+		if vertical:
+			return x - 6, y - 6, 12, length + 12
+		return x - 6, y - 6, length + 12, 12
 
-			w, h = self._paintPeriod(drawer, day, daysCount, x, y, width, height)
-			minHeight += h
+	def _moveNowLine( self ):
+		"""
+		Moves the 'now' line to the current time, repainting only the
+		strips it leaves and enters. The whole view is refreshed when
+		the day changes, since today is highlighted.
+		"""
+		layout = self._layout
+		if layout is None or layout.state.today != utils.dateToOrdinal(wx.DateTime.Now()):
+			self.Refresh()
+			return
 
-			return w, minHeight
+		for rect in self._updateNowLines():
+			self._repaintViewRect(*rect)
 
 	def _processEvt( self, commandEvent, point ):
 		""" 
@@ -831,19 +759,11 @@ class wxSchedulerPaint( object ):
 		self.ProcessEvent( evt ) 
 
 	def DoPaint(self, drawer, x, y, width, height):
-		for schedule, _, _ in self._schedulesCoords:
-			schedule.Destroy()
-
-		self._schedulesCoords = list()
-
-		day = utils.copyDate(self.GetDate())
+		layout = self._computeLayout(drawer, x, y, width, height)
+		self._recordLayout(layout)
+		self._renderLayout(drawer, layout)
 
-		if self._viewType == wxSCHEDULER_DAILY:
-			return self._paintDaily(drawer, day, x, y, width, height)
-		elif self._viewType == wxSCHEDULER_WEEKLY:
-			return self._paintWeekly(drawer, day, x, y, width, height)
-		elif self._viewType == wxSCHEDULER_MONTHLY:
-			return self._paintMonthly(drawer, day, x, y, width, height)
+		return layout.width, layout.height
 
 	def GetViewSize(self):
 		# Used by wxSchedulerReport
@@ -862,37 +782,23 @@ class wxSchedulerPaint( object ):
 			minW, minH = MONTH_CELL_SIZE_MIN.width * 7, 0 # will be computed
 
 		if self._viewType == wxSCHEDULER_MONTHLY or self._style == wxSCHEDULER_HORIZONTAL:
-			memDC = wx.MemoryDC()
-			bmp = wx.EmptyBitmap(1, 1)
-			memDC.SelectObject(bmp)
-			try:
-				if self._drawerClass.use_gc:
-					context = wx.GraphicsContext.Create(memDC)
-					context.SetFont(wx.NORMAL_FONT, wx.BLACK)
-				else:
-					context = memDC
-					context.SetFont(wx.NORMAL_FONT)
+			if isinstance(self, wx.ScrolledWindow):
+				size = self.GetVirtualSize()
+			else:
+				size = self.GetSize()
 
-				if isinstance(self, wx.ScrolledWindow):
-					size = self.GetVirtualSize()
-				else:
-					size = self.GetSize()
-
-				# Actually, only the min height may vary...
-				_, minH = self.DoPaint(self._drawerClass(context, self._lstDisplayedHours),
-						       0, 0, size.GetWidth(), 0)
-
-				if self._style == wxSCHEDULER_HORIZONTAL:
-					if self._viewType == wxSCHEDULER_DAILY:
-						minW = self._periodWidth * 4
-					elif self._viewType == wxSCHEDULER_WEEKLY:
-						minW = self._periodWidth * 7
-					elif self._viewType == wxSCHEDULER_MONTHLY:
-						return wx.Size(self._periodWidth * wx.DateTime.GetNumberOfDaysInMonth(self.GetDate().GetMonth()), minH)
+			# Actually, only the min height may vary...
+			minH = self._measureLayout(size.GetWidth(), 0).height
+
+			if self._style == wxSCHEDULER_HORIZONTAL:
+				if self._viewType == wxSCHEDULER_DAILY:
+					minW = self._periodWidth * 4
+				elif self._viewType == wxSCHEDULER_WEEKLY:
+					minW = self._periodWidth * 7
 				elif self._viewType == wxSCHEDULER_MONTHLY:
-					return wx.Size(minW, minH)
-			finally:
-				memDC.SelectObject(wx.NullBitmap)
+					return wx.Size(self._periodWidth * wx.DateTime.GetNumberOfDaysInMonth(self.GetDate().GetMonth()), minH)
+			elif self._viewType == wxSCHEDULER_MONTHLY:
+				return wx.Size(minW, minH)
 		elif self._style == wxSCHEDULER_VERTICAL:
 			return wx.Size(minW * self._periodCount + LEFT_COLUMN_SIZE, minH)
 
@@ -905,79 +811,189 @@ class wxSchedulerPaint( object ):
 
 	def InvalidateMinSize(self):
 		self._minSize = None
-		self._datetimeCoords = list()
+		self._slotGrid = None
 
 	def DrawBuffer( self ):
 		if isinstance(self, wx.ScrolledWindow):
 			if self._resizable:
 				size = self.GetVirtualSize()
+
+				# Grow the view to what the layout needs before laying
+				# it out for good; nothing is drawn until then.
+				layout = self._measureLayout(size.GetWidth(), size.GetHeight())
+				width, height = int(layout.width), int(layout.height)
+				if width > size.GetWidth() or height > size.GetHeight():
+					size = wx.Size(max(width, size.GetWidth()), max(height, size.GetHeight()))
+					self.SetVirtualSize(size)
 			else:
 				size = self.CalcMinSize()
+
+			self._bufferSize = (size.GetWidth(), size.GetHeight())
+
+			# Tiles are drawn when painted
+			self._layoutView()
 		else:
 			size = self.GetSize()
+			self._bufferSize = (size.GetWidth(), size.GetHeight())
+			self._renderBuffer()
+
+	def _measureLayout( self, width, height ):
+		"""
+		Returns the layout of the view for the given size, without
+		drawing anything. It goes to the layout cache, so laying out
+		the same size again afterwards costs nothing.
+		"""
+		memDC = self._getMeasuringDC()
+		try:
+			return self._computeLayout(self._drawerClass(self._getContext(memDC), self._lstDisplayedHours),
+						   0, 0, width, height)
+		finally:
+			memDC.SelectObject(wx.NullBitmap)
+
+	def _layoutView( self ):
+		"""
+		Lays the view out with the size DrawBuffer computed. Tiles of
+		the grid layer are dropped if the grid changed, those of the
+		schedules layer if the layout changed.
+		"""
+		layout = self._measureLayout(*self._bufferSize)
+
+		gridKey = (layout.state.Key(), self._drawerClass, self._highlightColor.Get(),
+			   layout.headers, layout.hours, layout.days)
+		if gridKey != self._gridKey:
+			self._gridKey = gridKey
+			self._gridTiles.Clear()
+			self._scheduleTiles.Clear()
+		elif layout is not self._layout:
+			self._scheduleTiles.Clear()
+
+		self._recordLayout(layout)
+
+	def _renderBuffer( self ):
+		"""
+		Draws the whole view in the buffer bitmap, with the size
+		DrawBuffer computed.
+		"""
+		width, height = self._bufferSize
 
-		self._bitmap = wx.EmptyBitmap(size.GetWidth(), size.GetHeight())
+		self._bitmap = wx.EmptyBitmap(width, height)
 		memDC = wx.MemoryDC()
 		memDC.SelectObject(self._bitmap)
 		try:
 			memDC.BeginDrawing()
 			try:
-				memDC.SetBackground( wx.Brush( SCHEDULER_BACKGROUND_BRUSH() ) )
+				memDC.SetBackground( self._resources.GetBrush( SCHEDULER_BACKGROUND_BRUSH() ) )
 				memDC.SetPen( FOREGROUND_PEN )
 				memDC.Clear()
 				memDC.SetFont(wx.NORMAL_FONT)
 
-				if self._drawerClass.use_gc:
-					context = wx.GraphicsContext.Create(memDC)
-					context.SetFont(wx.NORMAL_FONT, wx.BLACK)
-				else:
-					context = memDC
-					context.SetFont(wx.NORMAL_FONT)
-
-				width, height = self.DoPaint(self._drawerClass(context, self._lstDisplayedHours),
-							     0, 0, size.GetWidth(), size.GetHeight())
+				self.DoPaint(self._drawerClass(self._getContext(memDC), self._lstDisplayedHours),
+					     0, 0, width, height)
 			finally:
 				memDC.EndDrawing()
 		finally:
 			memDC.SelectObject(wx.NullBitmap)
 
-		# Bad things may happen here from time to time.
-		if isinstance(self, wx.ScrolledWindow):
-			if self._resizable and not self._guardRedraw:
-				self._guardRedraw = True
-				try:
-					if int(width) > size.GetWidth() or int(height) > size.GetHeight():
-						self.SetVirtualSize(wx.Size(int(width), int(height)))
-						self.DrawBuffer()
-				finally:
-					self._guardRedraw = False
+	def _getTile( self, key ):
+		"""
+		Returns the tile 'key' of the schedules layer, drawn over the
+		same tile of the grid layer. Missing tiles of both layers are
+		drawn from the current layout and cached.
+		"""
+		bitmap = self._scheduleTiles.Get(key)
+		if bitmap is None:
+			grid = self._gridTiles.Get(key)
+			if grid is None:
+				grid = self._renderTile(key, self._gridTiles, None, self._renderGrid)
+			bitmap = self._renderTile(key, self._scheduleTiles, grid, self._renderSchedules)
 
-	def RefreshSchedule( self, schedule ):
-		if schedule.bounds is not None:
-			memDC = wx.MemoryDC()
-			memDC.SelectObject(self._bitmap)
+		return bitmap
+
+	def _renderTile( self, key, tiles, base, render ):
+		"""
+		Draws the tile 'key' of a layer with render(drawer, layout,
+		rect), over the 'base' bitmap if not None, stores it in the
+		'tiles' cache and returns it.
+		"""
+		x, y, w, h = tiles.GetTileRect(key)
+		w = min(w, self._bufferSize[0] - x)
+		h = min(h, self._bufferSize[1] - y)
+
+		bitmap = wx.EmptyBitmap(w, h)
+		memDC = wx.MemoryDC()
+		memDC.SelectObject(bitmap)
+		try:
+			memDC.BeginDrawing()
 			try:
-				memDC.BeginDrawing()
-				memDC.SetBackground( wx.Brush( SCHEDULER_BACKGROUND_BRUSH() ) )
+				if base is None:
+					memDC.SetBackground( self._resources.GetBrush( SCHEDULER_BACKGROUND_BRUSH() ) )
+					memDC.Clear()
+				else:
+					memDC.DrawBitmap(base, 0, 0, False)
 				memDC.SetPen( FOREGROUND_PEN )
 				memDC.SetFont(wx.NORMAL_FONT)
 
-				if self._drawerClass.use_gc:
-					context = wx.GraphicsContext.Create(memDC)
-					context.SetFont(wx.NORMAL_FONT, wx.BLACK)
-				else:
-					context = memDC
-					context.SetFont(wx.NORMAL_FONT)
-
-				self._drawerClass(context, self._lstDisplayedHours)._DrawSchedule(schedule, *schedule.bounds)
+				context = self._getContext(memDC, (x, y))
+				render(self._drawerClass(context, self._lstDisplayedHours), self._layout, (x, y, w, h))
 			finally:
-				memDC.SelectObject(wx.NullBitmap)
+				memDC.EndDrawing()
+		finally:
+			memDC.SelectObject(wx.NullBitmap)
+
+		tiles.Put(key, bitmap, w * h * 4)
 
-			originX, originY = self.GetViewStart()
-			unitX, unitY = self.GetScrollPixelsPerUnit()
-			x, y, w, h = schedule.bounds
-			self.RefreshRect(wx.Rect(math.floor(x - originX * unitX) - 1, math.floor(y - originY * unitY) - 1,
-						 math.ceil(w) + 2, math.ceil(h) + 2))
+		return bitmap
+
+	def _getTileKeys( self, x, y, w, h ):
+		"""
+		Returns the keys of the tiles intersecting a rectangle of the
+		view, ignoring what lies out of the view.
+		"""
+		width, height = self._bufferSize
+		x1, y1 = max(0, x), max(0, y)
+
+		return self._scheduleTiles.GetTileKeys(x1, y1, min(width, x + w) - x1, min(height, y + h) - y1)
+
+	def _prefetchTile( self ):
+		"""
+		Draws one of the tiles next to the visible part of the view,
+		in the last scroll direction, if the cache has room for it.
+		Returns True if a tile was drawn.
+		"""
+		dx, dy = self._scrollDirection
+		if self._layout is None or (dx, dy) == (0, 0):
+			return False
+
+		size = TILE_SIZE
+		for tiles in (self._gridTiles, self._scheduleTiles):
+			if tiles.GetTotal() + size * size * 4 > tiles.GetBudget():
+				return False
+
+		x, y, w, h = self._getVisibleRect()
+
+		rects = []
+		if dx:
+			rects.append((x + (dx > 0 and w or -size), y, size, h))
+		if dy:
+			rects.append((x, y + (dy > 0 and h or -size), w, size))
+
+		for rect in rects:
+			for key in self._getTileKeys(*rect):
+				if key not in self._scheduleTiles:
+					self._getTile(key)
+					return True
+
+		return False
+
+	def RefreshSchedule( self, schedule ):
+		"""
+		Repaints a schedule whose extent did not change, e.g. after
+		its color changed.
+		"""
+		for view, pointMin, pointMax in self._schedulesCoords:
+			if view.GetClientData() is schedule:
+				self._refreshViewRect(pointMin.x - 1, pointMin.y - 1,
+						      pointMax.x - pointMin.x + 3, pointMax.y - pointMin.y + 3)
 
 	def OnPaint( self, evt = None ):
 		# Do the draw
@@ -990,10 +1006,106 @@ class wxSchedulerPaint( object ):
 
 		dc.BeginDrawing()
 		try:
-			dc.DrawBitmap(self._bitmap, 0, 0, False)
+			if isinstance(self, wx.ScrolledWindow):
+				self._paintTiles(dc)
+			else:
+				dc.DrawBitmap(self._bitmap, 0, 0, False)
 		finally:
 			dc.EndDrawing()
 
+	def _paintTiles( self, dc ):
+		"""
+		Blits the tiles intersecting the update region, drawing those
+		missing from the cache, then draws the overlay over them.
+		"""
+		if self._layout is None:
+			return
+
+		x, y, w, h = self._getVisibleRect()
+		if self._visibleOrigin is not None and (x, y) != self._visibleOrigin:
+			dx, dy = x - self._visibleOrigin[0], y - self._visibleOrigin[1]
+			self._scrollDirection = ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+		self._visibleOrigin = (x, y)
+
+		rects = []
+		regions = wx.RegionIterator(self.GetUpdateRegion())
+		while regions:
+			rect = regions.GetRect()
+			rects.append((x + rect.x, y + rect.y, rect.width, rect.height))
+			regions.Next()
+
+		if not rects:
+			rects = [(x, y, w, h)]
+
+		keys = set()
+		for rect in rects:
+			for key in self._getTileKeys(*rect):
+				if key in keys:
+					continue
+				keys.add(key)
+
+				tileX, tileY, _, _ = self._scheduleTiles.GetTileRect(key)
+				dc.DrawBitmap(self._getTile(key), tileX, tileY, False)
+
+		box = self.GetUpdateRegion().GetBox()
+		if box.IsEmpty():
+			box = (x, y, w, h)
+		else:
+			box = (x + box.x, y + box.y, box.width, box.height)
+
+		self._renderOverlay(self._drawerClass(self._getContext(dc, (x, y)), self._lstDisplayedHours),
+				    self._layout, box)
+
+		if self._dragGhost is not None:
+			ghostX, ghostY, ghostW, ghostH, color = self._dragGhost
+			dc.SetBrush( self._resources.GetBrush( color ) )
+			dc.SetPen( wx.BLACK_PEN )
+			dc.DrawRoundedRectangle( ghostX, ghostY, ghostW, ghostH, 5 )
+
+	def _snapshotView( self ):
+		"""
+		Returns a bitmap of the visible part of the view, drawn from
+		the cached tiles and the overlay, or None if there is nothing
+		to show yet.
+		"""
+		if self._layout is None:
+			return None
+
+		x, y, w, h = self._getVisibleRect()
+		if w <= 0 or h <= 0:
+			return None
+
+		bitmap = wx.EmptyBitmap(w, h)
+		memDC = wx.MemoryDC()
+		memDC.SelectObject(bitmap)
+		try:
+			memDC.SetBackground( self._resources.GetBrush( SCHEDULER_BACKGROUND_BRUSH() ) )
+			memDC.Clear()
+			memDC.SetDeviceOrigin(-x, -y)
+
+			for key in self._getTileKeys(x, y, w, h):
+				tileX, tileY, _, _ = self._scheduleTiles.GetTileRect(key)
+				memDC.DrawBitmap(self._getTile(key), tileX, tileY, False)
+
+			self._renderOverlay(self._drawerClass(self._getContext(memDC, (x, y)), self._lstDisplayedHours),
+					    self._layout, (x, y, w, h))
+		finally:
+			memDC.SelectObject(wx.NullBitmap)
+
+		return bitmap
+
+	def SetTileCacheBudget( self, budget ):
+		"""
+		Sets how many bytes the tiles a scrolled view is drawn in may
+		take, half for each layer; the least recently used tiles are
+		dropped beyond that.
+		"""
+		self._gridTiles.SetBudget(budget // 2)
+		self._scheduleTiles.SetBudget(budget - budget // 2)
+
+	def GetTileCacheBudget( self ):
+		return self._gridTiles.GetBudget() + self._scheduleTiles.GetBudget()
+
 	def SetResizable( self, value ):
 		"""
 		Draw proportionally of actual space but not down on minimun sizes
@@ -1017,6 +1129,25 @@ class wxSchedulerPaint( object ):
 		"""
 		return self._style
 
+	def SetRowPacking( self, packing ):
+		"""
+		Sets how schedules are distributed on rows in horizontal
+		style.  Values  for  'packing'  may  be
+		wxSCHEDULER_PACKING_MINIMAL  (the default, as few rows as
+		possible) or wxSCHEDULER_PACKING_CHAINED  (the historical
+		behaviour, chaining each schedule with the nearest one
+		starting after it ends).
+		"""
+		self._rowPacking = packing
+		self.InvalidateMinSize()
+		self.Refresh()
+
+	def GetRowPacking( self ):
+		"""
+		Returns the current row packing in horizontal style.
+		"""
+		return self._rowPacking
+
 	def SetHighlightColor( self, color ):
 		"""
 		Sets the highlight color, i.e. the color used to draw
@@ -1084,7 +1215,7 @@ class wxSchedulerPaint( object ):
 		dc = wx.PaintDC( self._headerPanel )
 		dc.BeginDrawing()
 		try:
-			dc.SetBackground( wx.Brush( SCHEDULER_BACKGROUND_BRUSH() ) )
+			dc.SetBackground( self._resources.GetBrush( SCHEDULER_BACKGROUND_BRUSH() ) )
 			dc.SetPen( FOREGROUND_PEN )
 			dc.Clear()
 			dc.SetFont( wx.NORMAL_FONT )
@@ -1103,51 +1234,20 @@ class wxSchedulerPaint( object ):
 			else:
 				width, _ = self.CalcMinSize()
 
-			day = utils.copyDate(self.GetDate())
-
-			x, y = 0, 0
-
 			# Take horizontal scrolling into account
 			x0, _ = self.GetViewStart()
 			xu, _ = self.GetScrollPixelsPerUnit()
-			x0 *= xu
-			x -= x0
+			x = -x0 * xu
 
-			self._headerBounds = []
-
-			if self._viewType == wxSCHEDULER_DAILY:
-				if self._style == wxSCHEDULER_VERTICAL:
-					x += LEFT_COLUMN_SIZE
-					width -= LEFT_COLUMN_SIZE
-				theDay = utils.copyDateTime(day)
-				maxDY = 0
-				for idx in xrange(self._periodCount):
-					_, h = self._paintDailyHeaders(drawer, theDay, x + 1.0 * width / self._periodCount * idx, y, 1.0 * width / self._periodCount, 36)
-					maxDY = max(maxDY, h)
-					theDay.AddDS(wx.DateSpan(days=1))
-				h = maxDY
-			elif self._viewType == wxSCHEDULER_WEEKLY:
-				if self._style == wxSCHEDULER_VERTICAL:
-					x += LEFT_COLUMN_SIZE
-					width -= LEFT_COLUMN_SIZE
-				theDay = utils.copyDateTime(day)
-				maxDY = 0
-				for idx in xrange(self._periodCount):
-					h = self._paintWeeklyHeaders(drawer, theDay, x + 1.0 * width / self._periodCount * idx, y, 1.0 * width / self._periodCount, 36)
-					maxDY = max(maxDY, h)
-					theDay.AddDS(wx.DateSpan(weeks=1))
-				h = maxDY
-			elif self._viewType == wxSCHEDULER_MONTHLY:
-				_, h = self._paintMonthlyHeaders(drawer, day, x, y, width, 36)
+			layout = computeHeaderLayout(self._getLayoutState(width, 36), wxDrawerMetrics(drawer), x, width, 36)
+			self._renderHeaders(drawer, layout)
+			self._headerBounds = layout.headerBounds
 
+			h = layout.height
 			minW, minH = self._headerPanel.GetMinSize()
 			if minH != h:
 				self._headerPanel.SetMinSize(wx.Size(-1, h))
 				self._headerPanel.GetParent().Layout()
-
-			# Mmmmh, maybe we'll support this later, but not right now
-			if self._style == wxSCHEDULER_VERTICAL:
-				self._headerBounds = []
 		finally:
 			dc.EndDrawing()
 
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import weakref
+import wx
+
+
+class _MinuteTimer(wx.Timer):
+	def __init__(self, callback):
+		super(_MinuteTimer, self).__init__()
+		self._callback = callback
+
+	def Notify(self):
+		self._callback()
+
+
+class wxMinuteTicker(object):
+	"""
+	Singleton clock shared by all wxScheduler instances. A single
+	timer fires on each minute boundary; the subscribers showing the
+	'now' line then get their OnMinute() called. Those shown on
+	screen are called one per idle event, so that dozens of
+	schedulers do not all draw at once; hidden ones, which only mark
+	themselves dirty, right away. Subscribers are weakly referenced.
+	"""
+
+	def __init__(self):
+		self._subscribers = []
+		self._pending = []
+		self._timer = None
+		self._app = None
+
+	def Subscribe(self, scheduler):
+		for ref in self._subscribers:
+			if ref() is scheduler:
+				return
+
+		self._subscribers.append(weakref.ref(scheduler))
+
+		if self._timer is None:
+			self._timer = _MinuteTimer(self._OnTimer)
+		if not self._timer.IsRunning():
+			self._Start()
+
+	def Unsubscribe(self, scheduler):
+		self._subscribers = [ref for ref in self._subscribers if ref() not in (scheduler, None)]
+
+	def _Start(self):
+		self._timer.Start(int(1000 * (60 - (time.time() % 60))) + 1, True)
+
+	def _OnTimer(self):
+		subscribers = []
+		for ref in self._subscribers:
+			scheduler = ref()
+			# Dead wx objects are false
+			if scheduler:
+				subscribers.append(ref)
+				if not scheduler.GetShowNow() or ref in self._pending:
+					continue
+				if scheduler.IsShownOnScreen():
+					self._pending.append(ref)
+				else:
+					# Only marks it dirty, so that it is drawn up to
+					# date when shown again
+					scheduler.OnMinute()
+		self._subscribers = subscribers
+
+		if self._pending:
+			app = wx.GetApp()
+			if app is not self._app:
+				app.Bind(wx.EVT_IDLE, self._OnIdle)
+				self._app = app
+			wx.WakeUpIdle()
+
+		if self._subscribers:
+			self._Start()
+
+	def _OnIdle(self, event):
+		if self._pending:
+			scheduler = self._pending.pop(0)()
+			if scheduler:
+				scheduler.OnMinute()
+
+			if self._pending:
+				event.RequestMore()
+
+		event.Skip()
+
+wxMinuteTicker = wxMinuteTicker()
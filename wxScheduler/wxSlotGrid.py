@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import bisect
+
+
+class wxSlotGrid(object):
+	"""
+	The clickable time slots of a view, as a uniform grid of
+	'columns' by 'rows' cells of 'columnWidth' by 'rowHeight' pixels
+	starting at (x, y). Nothing is stored per slot: points and times
+	are mapped to each other by arithmetic.
+
+	Days are proleptic Gregorian ordinals and 'minutes' the sorted
+	slot starts, in minutes since midnight (the displayed slots).
+	If 'vertical' is True, each column is a day and each row a slot
+	of the day. Otherwise cells are numbered row by row and each
+	day takes len(minutes) consecutive cells; a month calendar is a
+	grid of 7 columns and minutes [0]. 'firstDay' is the day of the
+	first cell; days outside 'dayRange', a (first, last) tuple which
+	defaults to every day of the grid, have no slot.
+
+	This module does not depend on wx.
+	"""
+
+	def __init__( self, x, y, columnWidth, rowHeight, columns, rows, firstDay, minutes,
+		      vertical=True, dayRange=None ):
+		self.x = x
+		self.y = y
+		self.columnWidth = columnWidth
+		self.rowHeight = rowHeight
+		self.columns = columns
+		self.rows = rows
+		self.firstDay = firstDay
+		self.minutes = list( minutes )
+		self.vertical = vertical
+
+		if dayRange is None:
+			dayRange = firstDay, firstDay + self._cellDay( columns - 1, rows - 1 )
+		self.dayRange = dayRange
+
+	def __len__( self ):
+		if not self.minutes:
+			return 0
+		return max( 0, self.dayRange[1] - self.dayRange[0] + 1 ) * len( self.minutes )
+
+	def _cellDay( self, column, row ):
+		# Day of a cell, relative to firstDay
+		if not self.minutes:
+			return 0
+		if self.vertical:
+			return column
+		return ( row * self.columns + column ) // len( self.minutes )
+
+	def GetSlot( self, x, y ):
+		"""
+		Returns the (day, minute) of the slot at (x, y), or None.
+		Slot bounds are included.
+		"""
+		if not self.minutes or self.columns <= 0 or self.rows <= 0 or \
+		       self.columnWidth <= 0 or self.rowHeight <= 0:
+			return None
+
+		column = int( ( x - self.x ) // self.columnWidth )
+		row = int( ( y - self.y ) // self.rowHeight )
+
+		# Right and bottom edges belong to the last cell
+		if column == self.columns and x <= self.x + self.columns * self.columnWidth:
+			column -= 1
+		if row == self.rows and y <= self.y + self.rows * self.rowHeight:
+			row -= 1
+
+		if not ( 0 <= column < self.columns and 0 <= row < self.rows ):
+			return None
+
+		if self.vertical:
+			day, slot = column, row
+		else:
+			index = row * self.columns + column
+			day, slot = divmod( index, len( self.minutes ) )
+
+		day += self.firstDay
+		if not self.dayRange[0] <= day <= self.dayRange[1]:
+			return None
+
+		return day, self.minutes[ slot ]
+
+	def GetSlotRect( self, day, minute ):
+		"""
+		Returns the (x1, y1, x2, y2) corners of the slot which the
+		time 'minute' of 'day' falls in, or None if there is none.
+		"""
+		if not self.dayRange[0] <= day <= self.dayRange[1]:
+			return None
+
+		slot = bisect.bisect_right( self.minutes, minute ) - 1
+		if slot < 0:
+			return None
+
+		if self.vertical:
+			column, row = day - self.firstDay, slot
+		else:
+			row, column = divmod( ( day - self.firstDay ) * len( self.minutes ) + slot, self.columns )
+
+		x = self.x + column * self.columnWidth
+		y = self.y + row * self.rowHeight
+
+		return x, y, x + self.columnWidth, y + self.rowHeight
+
+	def HitTest( self, x, y ):
+		"""
+		Returns (day, minute, (x1, y1, x2, y2)) for the slot at
+		(x, y), or None.
+		"""
+		slot = self.GetSlot( x, y )
+		if slot is None:
+			return None
+		return slot + ( self.GetSlotRect( *slot ), )
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+class wxSpatialIndex(object):
+	"""
+	Uniform grid over rectangles, used by wxSchedulerPaint to find
+	the schedules under the mouse without scanning all of them.
+
+	Items are given as (item, x1, y1, x2, y2) tuples, x1 <= x2 and
+	y1 <= y2. Each rectangle is registered in every 'cellSize' by
+	'cellSize' pixels cell it touches; a query only looks at the
+	cells it covers. Results keep the order in which items were
+	given, so that the first one is the one drawn first.
+
+	This module does not depend on wx.
+	"""
+
+	def __init__( self, rects=(), cellSize=64 ):
+		self.cellSize = cellSize
+
+		self._rects = []
+		self._cells = {}
+
+		for rect in rects:
+			self.Add( *rect )
+
+	def __len__( self ):
+		return len( self._rects )
+
+	def _range( self, lo, hi ):
+		return range( int( lo // self.cellSize ), int( hi // self.cellSize ) + 1 )
+
+	def Add( self, item, x1, y1, x2, y2 ):
+		sequence = len( self._rects )
+		self._rects.append( ( item, x1, y1, x2, y2 ) )
+
+		for cellX in self._range( x1, x2 ):
+			for cellY in self._range( y1, y2 ):
+				self._cells.setdefault( ( cellX, cellY ), [] ).append( sequence )
+
+	def Clear( self ):
+		self._rects = []
+		self._cells = {}
+
+	def ItemsAt( self, x, y, margin=0 ):
+		"""
+		Returns the items whose rectangle, grown by 'margin' on each
+		side, contains (x, y); bounds are included.
+		"""
+		return self.ItemsInRect( x - margin, y - margin, x + margin, y + margin )
+
+	def ItemsInRect( self, x1, y1, x2, y2 ):
+		"""
+		Returns the items whose rectangle intersects the given one,
+		bounds included, e.g. for a rubber band selection.
+		"""
+		return [ rect[0] for rect in self.RectsInRect( x1, y1, x2, y2 ) ]
+
+	def RectsInRect( self, x1, y1, x2, y2 ):
+		"""
+		Same as ItemsInRect, but returns the (item, x1, y1, x2, y2)
+		tuples.
+		"""
+		found = set()
+		for cellX in self._range( x1, x2 ):
+			for cellY in self._range( y1, y2 ):
+				found.update( self._cells.get( ( cellX, cellY ), () ) )
+
+		results = []
+		for sequence in sorted( found ):
+			rect = self._rects[ sequence ]
+			if rect[1] <= x2 and x1 <= rect[3] and rect[2] <= y2 and y1 <= rect[4]:
+				results.append( rect )
+
+		return results
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+
+
+class wxParagraph(object):
+	"""
+	Text wrapped by layoutParagraph(). 'lines' holds (y, height,
+	words, justified) tuples, 'words' being (text, x) pairs relative
+	to the paragraph; 'height' is the height the paragraph takes,
+	bottom margin included.
+	"""
+
+	def __init__( self, lines, height ):
+		self.lines = lines
+		self.height = height
+
+
+def layoutParagraph( text, offsetX, width, margin, measure ):
+	"""
+	Wraps 'text' in lines of 'width' pixels, the first one starting
+	at 'offsetX' and the next ones at 'margin', and returns a
+	wxParagraph. Lines are 'margin' pixels apart; words of the lines
+	that are cut are spread over the whole width. measure(text)
+	returns the (width, height) of a text.
+	"""
+	lines = []
+	y = 0
+	words = text.split()
+
+	while True:
+		textW, textH = measure( u' '.join( words ) )
+
+		if textW <= width - offsetX:
+			lines.append( ( y, textH, [ ( u' '.join( words ), offsetX ) ], False ) )
+			return wxParagraph( lines, y + textH + margin )
+
+		shown = []
+		remaining = width - offsetX
+		totalW = 0
+		spaceW, _ = measure( u' ' )
+
+		for index, word in enumerate( words ):
+			wordW, _ = measure( word )
+			if remaining - wordW - spaceW <= 0:
+				break
+			totalW += wordW
+			remaining -= wordW + spaceW
+			shown.append( ( word, wordW ) )
+
+		positions = []
+		if shown:
+			words = words[ index: ]
+
+			if len( shown ) > 1:
+				if words:
+					spacing = ( 1.0 * ( width - offsetX ) - totalW ) / ( len( shown ) - 1 )
+				else:
+					spacing = spaceW
+			else:
+				spacing = 0.0
+
+			currentX = 1.0 * offsetX
+			for word, wordW in shown:
+				positions.append( ( word, currentX ) )
+				currentX += spacing + wordW
+		elif offsetX == margin:
+			# Can't display anything...
+			return wxParagraph( lines, y + margin )
+
+		lines.append( ( y, textH, positions, True ) )
+
+		if not words:
+			return wxParagraph( lines, y + textH + margin )
+
+		y += textH + margin
+		offsetX = margin
+
+
+class wxTextMetrics(object):
+	"""
+	Least recently used caches of text extents and paragraphs,
+	shared by the drawers (see wxDrawer.textMetrics). Entries are
+	keyed by font and text, 'font' being any hashable value
+	describing the font and the kind of context the text is measured
+	on; the 'maxSize' most recently used ones of each kind are kept.
+
+	Cached entries are only valid for a given resolution: Clear() the
+	cache when it changes.
+
+	This module does not depend on wx.
+	"""
+
+	def __init__( self, maxSize=4096 ):
+		self.maxSize = maxSize
+		self._extents = OrderedDict()      # Least recently used first
+		self._paragraphs = OrderedDict()
+
+	def __len__( self ):
+		return len( self._extents )
+
+	def __contains__( self, key ):
+		return key in self._extents
+
+	def _lookup( self, entries, key, compute ):
+		value = entries.pop( key, None )
+		if value is None:
+			value = compute()
+			if len( entries ) >= self.maxSize:
+				entries.popitem( False )
+
+		entries[ key ] = value
+
+		return value
+
+	def GetTextExtent( self, font, text, measure ):
+		"""
+		Returns the extent of 'text' in 'font', calling measure(text)
+		if it is not in the cache.
+		"""
+		return self._lookup( self._extents, ( font, text ), lambda: measure( text ) )
+
+	def GetParagraph( self, font, text, offsetX, width, margin, measure ):
+		"""
+		Returns the wxParagraph layoutParagraph() makes of 'text' in
+		'font', computing it if it is not in the cache.
+		"""
+		return self._lookup( self._paragraphs, ( font, text, offsetX, width, margin ),
+				     lambda: layoutParagraph( text, offsetX, width, margin, measure ) )
+
+	def Clear( self ):
+		self._extents.clear()
+		self._paragraphs.clear()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+class wxTileCache(object):
+	"""
+	Least recently used cache of the tiles a view is drawn in.  The
+	view is split in 'tileSize' pixels squares, keyed by (column,
+	row); each tile is stored with its size in bytes, and the least
+	recently used ones are dropped as soon as the total exceeds
+	'budget' bytes. Tiles are dropped selectively when something
+	changes in their area (see InvalidateRect).
+
+	The values are opaque (bitmaps in wxSchedulerPaint), so this
+	module does not depend on wx.
+	"""
+
+	def __init__( self, tileSize=256, budget=32 * 1024 * 1024 ):
+		self.tileSize = tileSize
+		self._budget = budget
+
+		self._tiles = {}  # key -> (value, size)
+		self._keys = []   # Least recently used first
+		self._total = 0
+
+	def __len__( self ):
+		return len( self._keys )
+
+	def __contains__( self, key ):
+		return key in self._tiles
+
+	def GetBudget( self ):
+		return self._budget
+
+	def SetBudget( self, budget ):
+		self._budget = budget
+		self._evict()
+
+	def GetTotal( self ):
+		"""
+		Returns the size in bytes of the tiles in the cache.
+		"""
+		return self._total
+
+	def Get( self, key ):
+		"""
+		Returns the tile stored for 'key', or None.
+		"""
+		tile = self._tiles.get( key, None )
+		if tile is None:
+			return None
+
+		if self._keys[-1] != key:
+			self._keys.remove( key )
+			self._keys.append( key )
+
+		return tile[0]
+
+	def Put( self, key, value, size ):
+		self.Remove( key )
+
+		self._tiles[ key ] = ( value, size )
+		self._keys.append( key )
+		self._total += size
+
+		self._evict()
+
+	def Remove( self, key ):
+		tile = self._tiles.pop( key, None )
+		if tile is not None:
+			self._keys.remove( key )
+			self._total -= tile[1]
+
+	def Clear( self ):
+		self._tiles = {}
+		self._keys = []
+		self._total = 0
+
+	def _evict( self ):
+		# The most recent tile is kept even if it is over the budget
+		while self._total > self._budget and len( self._keys ) > 1:
+			self.Remove( self._keys[0] )
+
+	def GetTileKeys( self, x, y, w, h ):
+		"""
+		Returns the keys of the tiles intersecting the rectangle,
+		row by row.
+		"""
+		if w <= 0 or h <= 0:
+			return []
+
+		size = self.tileSize
+		columns = range( int( x // size ), int( ( x + w - 1 ) // size ) + 1 )
+
+		return [ ( column, row ) for row in range( int( y // size ), int( ( y + h - 1 ) // size ) + 1 )
+			 for column in columns ]
+
+	def GetTileRect( self, key ):
+		"""
+		Returns the (x, y, w, h) rectangle of the tile 'key'.
+		"""
+		return key[0] * self.tileSize, key[1] * self.tileSize, self.tileSize, self.tileSize
+
+	def InvalidateRect( self, x, y, w, h ):
+		"""
+		Drops the tiles intersecting the rectangle.
+		"""
+		if w <= 0 or h <= 0:
+			return
+
+		size = self.tileSize
+		firstColumn, lastColumn = int( x // size ), int( ( x + w - 1 ) // size )
+		firstRow, lastRow = int( y // size ), int( ( y + h - 1 ) // size )
+
+		for column, row in self._keys[:]:
+			if firstColumn <= column <= lastColumn and firstRow <= row <= lastRow:
+				self.Remove( ( column, row ) )
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import bisect
+import datetime
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+
+class wxTimeAxis(object):
+	"""
+	Maps times to positions along the time axis of a period made of
+	'dayCount' consecutive days, where only working hours are shown.
+
+	Times are expressed in minutes since 0001-01-01 00:00 (see
+	wxScheduleUtils.dateTimeToSeconds), days as proleptic Gregorian
+	ordinals. 'workingHours' is a list of (start, end) pairs of
+	minutes since midnight, or a dictionary mapping week days (0 is
+	Sunday, as wx.DateTime.GetWeekDay) to such lists so that working
+	hours can differ from one day to the other.
+
+	The cumulated working minutes are computed once; mapping a time
+	is then a binary search among the working intervals.
+
+	When NumPy  is available,  ScheduleSizes  computes the geometry of
+	many schedules in  one vectorized pass; otherwise, or for a few
+	schedules, it falls back to Position.
+
+	This module does not depend on wx.
+	"""
+
+	# Below this many schedules, the scalar path is faster
+	VECTORIZE_THRESHOLD = 64
+
+	def __init__( self, firstDay, dayCount, workingHours ):
+		self.firstDay = firstDay
+		self.dayCount = dayCount
+
+		self._starts = []
+		self._ends = []
+		self._offsets = []
+
+		total = 0
+		for dayNumber in range( dayCount ):
+			day = firstDay + dayNumber
+
+			if isinstance( workingHours, dict ):
+				weekDay = ( datetime.date.fromordinal( day ).weekday() + 1 ) % 7
+				intervals = workingHours.get( weekDay, [] )
+			else:
+				intervals = workingHours
+
+			for startMinute, endMinute in intervals:
+				self._starts.append( day * 1440 + startMinute )
+				self._ends.append( day * 1440 + endMinute )
+				self._offsets.append( total )
+				total += endMinute - startMinute
+
+		self._total = total
+		self._arrays = None
+
+	def GetTotal( self ):
+		"""
+		Returns the number of working minutes in the period.
+		"""
+		return self._total
+
+	def Contains( self, minutes ):
+		"""
+		Returns True if the time lies in a working interval, or in a
+		pause between two intervals of the same day.
+		"""
+		idx = bisect.bisect_right( self._starts, minutes ) - 1
+		if idx < 0:
+			return False
+		if minutes < self._ends[ idx ]:
+			return True
+		return idx + 1 < len( self._starts ) and \
+		       self._starts[ idx + 1 ] // 1440 == self._starts[ idx ] // 1440
+
+	def Position( self, minutes ):
+		"""
+		Returns the number of working minutes before the given time.
+		Times outside working hours map to the nearest interval bound.
+		"""
+		idx = bisect.bisect_right( self._starts, minutes ) - 1
+		if idx < 0:
+			return 0
+		return self._offsets[ idx ] + min( minutes, self._ends[ idx ] ) - self._starts[ idx ]
+
+	def ScheduleSize( self, start, end ):
+		"""
+		Same  as wxDrawer.ScheduleSize: returns  the  size and the
+		position of the [start, end] interval, and the total length
+		of the axis, all in hours.
+		"""
+		position = self.Position( start )
+		size = max( 0, self.Position( end ) - position )
+
+		return size / 60.0, position / 60.0, self._total / 60.0
+
+	def ScheduleSizes( self, starts, ends, vectorize=None ):
+		"""
+		Returns a list of (size, position, total) tuples, as given by
+		ScheduleSize, for each (starts[i], ends[i]) interval.  The
+		NumPy path is used if 'vectorize' is True, or if it is None,
+		NumPy is installed and there are enough intervals.
+		"""
+		if vectorize is None:
+			vectorize = numpy is not None and len( starts ) >= self.VECTORIZE_THRESHOLD
+
+		total = self._total / 60.0
+
+		if not vectorize or not self._starts:
+			return [ self.ScheduleSize( start, end ) for start, end in zip( starts, ends ) ]
+
+		positions = self._positions( numpy.asarray( starts, dtype=numpy.int64 ) )
+		sizes = numpy.maximum( 0, self._positions( numpy.asarray( ends, dtype=numpy.int64 ) ) - positions )
+
+		return [ ( size / 60.0, position / 60.0, total )
+			 for size, position in zip( sizes.tolist(), positions.tolist() ) ]
+
+	def _positions( self, minutes ):
+		# Vectorized Position
+		if self._arrays is None:
+			self._arrays = tuple( [ numpy.asarray( values, dtype=numpy.int64 )
+						for values in ( self._starts, self._ends, self._offsets ) ] )
+		starts, ends, offsets = self._arrays
+
+		idx = numpy.searchsorted( starts, minutes, side='right' ) - 1
+		before = idx < 0
+		idx[ before ] = 0
+
+		positions = offsets[ idx ] + numpy.minimum( minutes, ends[ idx ] ) - starts[ idx ]
+		positions[ before ] = 0
+		return positions